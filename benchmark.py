@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Redmine Wiki downloader.
+
+A stub Redmine server (FixtureServer) serves a synthetic set of projects,
+wiki pages and attachments on localhost so runs are repeatable and do not
+depend on a real server or the network.
+
+    python benchmark.py startup --runs 5
+    python benchmark.py startup --executable dist/RedmineWikiDownloader/RedmineWikiDownloader
+    python benchmark.py convert --workers 0 1 2 4
+    python benchmark.py cancel
+    python benchmark.py engines --workers 16 256
+"""
+
+import argparse
+import http.server
+import json
+import os
+import re
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Iterator, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_SCRIPT = os.path.join(REPO_DIR, "main.py")
+
+
+class QuietHTTPServer(http.server.ThreadingHTTPServer):
+    """Threading server that ignores clients disconnecting mid-request"""
+
+    daemon_threads = True
+    request_queue_size = 1024  # The default of 5 drops connects when hundreds of workers start at once
+
+    def handle_error(self, request, client_address):
+        if not issubclass(sys.exc_info()[0], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FixtureServer:
+    """Stub Redmine REST API serving a generated set of projects and wiki pages"""
+
+    def __init__(self, projects: int = 3, pages: int = 10, page_size: int = 2000,
+                 attachments: int = 1, attachment_size: int = 4096, latency: float = 0.0,
+                 hang: float = 0.0, trickle: float = 0.0):
+        self.projects = {f"bench{i}": [f"Page {j}" for j in range(pages)] for i in range(projects)}
+        self.page_size = page_size
+        self.attachments = attachments
+        self.attachment_size = attachment_size
+        self.latency = latency
+        self.hang = hang  # Seconds wiki page requests stall before any response byte
+        self.trickle = trickle  # Seconds between 8 KB chunks of attachment bodies
+        self.first_request_at = None
+        self.request_count = 0
+        self.first_request = threading.Event()
+        self.requested = {'page': threading.Event(), 'attachment': threading.Event()}
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.httpd = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def page_text(self, title: str) -> str:
+        """Textile-ish body with headings, lists and image links for each attachment"""
+        lines = [f"h1. {title}", ""]
+        for n in range(self.attachments):
+            lines.append(f"!image_{n}.png!")
+        filler = "* Item with *bold* and _italic_ text and a [[Wiki link]]"
+        while sum(len(line) + 1 for line in lines) < self.page_size:
+            lines.append(filler)
+        return "\n".join(lines)
+
+    def page_xml(self, project: str, title: str, host: str) -> str:
+        attachments = "".join(
+            f"<attachment><id>{n}</id><filename>image_{n}.png</filename>"
+            f"<filesize>{self.attachment_size}</filesize>"
+            f"<content_url>http://{host}/attachments/download/{n}/image_{n}.png</content_url>"
+            f"</attachment>"
+            for n in range(self.attachments)
+        )
+        text = self.page_text(title).replace("&", "&amp;").replace("<", "&lt;")
+        return (f"<wiki_page><title>{title}</title><text>{text}</text><version>1</version>"
+                f"<updated_on>2026-01-01T00:00:00Z</updated_on>"
+                f"<attachments type=\"array\">{attachments}</attachments></wiki_page>")
+
+    def handle(self, handler: http.server.BaseHTTPRequestHandler):
+        with self.lock:
+            self.request_count += 1
+            if self.first_request_at is None:
+                self.first_request_at = time.time()
+                self.first_request.set()
+        if self.latency:
+            time.sleep(self.latency)
+
+        path = unquote(urlparse(handler.path).path)
+        host = handler.headers.get("Host", "127.0.0.1")
+        if path == "/projects.xml":
+            items = "".join(
+                f"<project><id>{i}</id><name>{name}</name><identifier>{name}</identifier></project>"
+                for i, name in enumerate(self.projects)
+            )
+            return 200, f'<projects total_count="{len(self.projects)}" offset="0" limit="100">{items}</projects>'
+        match = re.match(r"/projects/([^/]+)/wiki/index\.xml$", path)
+        if match and match.group(1) in self.projects:
+            titles = self.projects[match.group(1)]
+            query = parse_qs(urlparse(handler.path).query)
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["100"])[0])
+            items = "".join(
+                f"<wiki_page><title>{title}</title><version>1</version>"
+                f"<updated_on>2026-01-01T00:00:00Z</updated_on></wiki_page>"
+                for title in titles[offset:offset + limit]
+            )
+            return 200, (f'<wiki_pages total_count="{len(titles)}" offset="{offset}" limit="{limit}">'
+                         f'{items}</wiki_pages>')
+        match = re.match(r"/projects/([^/]+)/wiki/(.+)\.xml$", path)
+        if match and match.group(2) in self.projects.get(match.group(1), []):
+            self.requested['page'].set()
+            if self.hang:
+                self.stopped.wait(self.hang)
+            return 200, self.page_xml(match.group(1), match.group(2), host)
+        if path.startswith("/attachments/download/"):
+            self.requested['attachment'].set()
+            body = b"\x89PNG" + b"\0" * max(0, self.attachment_size - 4)
+            return 200, self.trickled(body) if self.trickle else body
+        return 404, ""
+
+    def trickled(self, body: bytes) -> Iterator[bytes]:
+        for offset in range(0, len(body), 8192):
+            if self.stopped.wait(self.trickle):
+                return
+            yield body[offset:offset + 8192]
+
+    def start(self) -> "FixtureServer":
+        fixture = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Like production servers, otherwise keep-alive clients stall on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, body = fixture.handle(self)
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/xml")
+                if isinstance(body, bytes):
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    # Trickled attachment, the size is announced up front like a real download
+                    self.send_header("Content-Length", str(fixture.attachment_size))
+                    self.end_headers()
+                    for chunk in body:
+                        self.wfile.write(chunk)
+                        self.wfile.flush()
+
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+def summarize(name: str, samples: List[float]):
+    if not samples:
+        print(f"{name:<28} skipped")
+        return
+    print(f"{name:<28} min {min(samples) * 1000:8.1f} ms   "
+          f"median {statistics.median(samples) * 1000:8.1f} ms   ({len(samples)} runs)")
+
+
+def launcher(executable: Optional[str]) -> List[str]:
+    return [executable] if executable else [sys.executable, MAIN_SCRIPT]
+
+
+def measure_import() -> float:
+    """Time for a fresh interpreter to import main (interpreter start-up excluded)"""
+    probe = ("import sys, time; sys.path.insert(0, sys.argv[1]); start = time.perf_counter(); "
+             "import main; print(time.perf_counter() - start)")
+    output = subprocess.check_output([sys.executable, "-c", probe, REPO_DIR], text=True)
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_headless(executable: Optional[str], timeout: float) -> Optional[float]:
+    """Time from process launch until the stub server sees the first request"""
+    fixture = FixtureServer(projects=1, pages=1).start()
+    save_dir = tempfile.mkdtemp(prefix="rwd-bench-")
+    try:
+        started = time.time()
+        process = subprocess.Popen(
+            launcher(executable) + ["--headless", "--url", fixture.url, "--api-key", "bench",
+                                    "--save-path", save_dir, "--progress-interval", "0"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            if not fixture.first_request.wait(timeout):
+                return None
+            return fixture.first_request_at - started
+        finally:
+            process.terminate()
+            process.wait()
+    finally:
+        fixture.stop()
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+
+def measure_gui(timeout: float) -> Optional[float]:
+    """Time from process launch until the main window has been mapped"""
+    probe = ("import sys, time; sys.path.insert(0, sys.argv[1]); import main; "
+             "app = main.RedmineWikiDownloader(); app.root.update(); app.root.wait_visibility(); "
+             "print(time.time(), flush=True); app.root.destroy()")
+    started = time.time()
+    try:
+        output = subprocess.check_output([sys.executable, "-c", probe, REPO_DIR],
+                                         text=True, timeout=timeout, stderr=subprocess.DEVNULL)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return None
+    return float(output.strip().splitlines()[-1]) - started
+
+
+def has_display() -> bool:
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def run_startup(args: argparse.Namespace) -> int:
+    imports, headless, gui = [], [], []
+    for _ in range(args.runs):
+        if not args.executable:
+            imports.append(measure_import())
+        sample = measure_headless(args.executable, args.timeout)
+        if sample is None:
+            print("Headless run made no request before the timeout")
+            return 1
+        headless.append(sample)
+        if not args.executable and has_display():
+            sample = measure_gui(args.timeout)
+            if sample is not None:
+                gui.append(sample)
+
+    target = args.executable or f"{os.path.basename(sys.executable)} main.py"
+    print(f"Startup time for {target}")
+    summarize("import main", imports)
+    summarize("launch -> first request", headless)
+    summarize("launch -> first window", gui)
+    if not args.executable and not has_display():
+        print("(no display available, GUI start-up not measured)")
+    return 0
+
+
+def run_convert(args: argparse.Namespace) -> int:
+    """Pages per second through process_page_to_file, in this thread (0) and with PageProcessor pools"""
+    sys.path.insert(0, REPO_DIR)
+    import main
+
+    fixture = FixtureServer(projects=1, pages=args.pages, page_size=args.page_size, attachments=args.attachments)
+    payloads = [fixture.page_xml("bench0", title, "127.0.0.1").encode("utf-8") for title in fixture.projects["bench0"]]
+
+    print(f"Converting {len(payloads)} pages of {args.page_size // 1024} KB with {args.attachments} "
+          f"attachments each, {os.cpu_count()} CPUs, batch size {args.batch}")
+    baseline = None
+    for workers in args.workers:
+        samples = []
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as save_dir:
+                if workers == 0:
+                    started = time.perf_counter()
+                    for payload in payloads:
+                        main.process_page_to_file(payload, save_dir)
+                    samples.append(time.perf_counter() - started)
+                else:
+                    processor = main.PageProcessor(workers, args.batch)
+                    processor.submit(payloads[0], save_dir).result()  # Workers are started on first use
+                    started = time.perf_counter()
+                    for future in [processor.submit(payload, save_dir) for payload in payloads]:
+                        future.result()
+                    samples.append(time.perf_counter() - started)
+                    processor.close()
+
+        elapsed = statistics.median(samples)
+        baseline = baseline or elapsed
+        label = "in-thread" if workers == 0 else f"{workers} processes"
+        print(f"{label:<14} {len(payloads) / elapsed:8.1f} pages/s   {baseline / elapsed:5.2f}x")
+    return 0
+
+
+def measure_cancel(fixture: FixtureServer, wait_for: str, engine: str, timeout: float) -> Optional[dict]:
+    """Send Ctrl+C to a headless run once the fixture has seen the given request kind
+
+    Returns seconds from the signal to process exit (None if it did not exit
+    within timeout), the cancel-to-idle time
+    the run recorded in run_metrics.json and any .part files left behind.
+    """
+    save_dir = tempfile.mkdtemp(prefix="rwd-bench-")
+    try:
+        process = subprocess.Popen(
+            [sys.executable, MAIN_SCRIPT, "--headless", "--url", fixture.url, "--api-key", "bench",
+             "--save-path", save_dir, "--progress-interval", "0", "--engine", engine],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            if not fixture.requested[wait_for].wait(timeout):
+                return None
+            time.sleep(0.5)  # Let the transfer get under way
+            signalled = time.monotonic()
+            process.send_signal(signal.SIGINT)
+            try:
+                process.wait(timeout)
+                exited = time.monotonic() - signalled
+            except subprocess.TimeoutExpired:
+                exited = None
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+        metrics_path = os.path.join(save_dir, "run_metrics.json")
+        idle = None
+        if os.path.exists(metrics_path):
+            with open(metrics_path, "r", encoding="utf-8") as f:
+                idle = json.load(f).get("cancel_to_idle_seconds")
+        leftovers = [name for _, _, files in os.walk(save_dir) for name in files if name.endswith(".part")]
+        return {'exit': exited, 'idle': idle, 'leftovers': leftovers}
+    finally:
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+
+def run_cancel(args: argparse.Namespace) -> int:
+    """Cancel-to-idle time with a hung page request and with a slow attachment in flight"""
+    if sys.platform == "win32":
+        print("The cancel benchmark sends SIGINT and needs a POSIX system")
+        return 1
+
+    scenarios = [
+        ("hung page request", "page", dict(projects=1, pages=8, hang=3600)),
+        ("slow attachment", "attachment", dict(projects=1, pages=8, attachment_size=64 * 1024 ** 2, trickle=0.05)),
+    ]
+    status = 0
+    for engine, (scenario, wait_for, options) in [(e, s) for e in args.engines for s in scenarios]:
+        name = f"{engine}, {scenario}"
+        exits, idles = [], []
+        for _ in range(args.runs):
+            fixture = FixtureServer(**options).start()
+            try:
+                result = measure_cancel(fixture, wait_for, engine, args.timeout)
+            finally:
+                fixture.stop()
+            if result is None:
+                print(f"{name}: the run never reached the {wait_for} request")
+                return 1
+            if result['exit'] is None:
+                print(f"{name}: still running {args.timeout:.0f} s after Ctrl+C")
+                status = 1
+                continue
+            if result['leftovers']:
+                print(f"{name}: partial files left behind: {result['leftovers']}")
+                status = 1
+            exits.append(result['exit'])
+            if result['idle'] is not None:
+                idles.append(result['idle'])
+        summarize(f"{name}: cancel -> idle", idles)
+        summarize(f"{name}: cancel -> exit", exits)
+    return status
+
+
+def measure_download(fixture: FixtureServer, engine: str, workers: int) -> dict:
+    """Full headless run against the fixture, returns wall time and peak memory of the process"""
+    save_dir = tempfile.mkdtemp(prefix="rwd-bench-")
+    try:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, MAIN_SCRIPT, "--headless", "--url", fixture.url, "--api-key", "bench",
+             "--save-path", save_dir, "--progress-interval", "0", "--engine", engine, "--workers", str(workers)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        peak_rss = None
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = status >> 8
+            # ru_maxrss is in KB on Linux and in bytes on macOS
+            peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        else:
+            process.wait()
+        elapsed = time.perf_counter() - started
+
+        with open(os.path.join(save_dir, "run_metrics.json"), "r", encoding="utf-8") as f:
+            metrics = json.load(f)
+        return {'elapsed': elapsed, 'peak_rss': peak_rss, 'pages': metrics['pages_done'],
+                'failed': metrics['failed_items'], 'exit_code': process.returncode}
+    finally:
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+
+def run_engines(args: argparse.Namespace) -> int:
+    """Threaded and asyncio engines on the same fixture, per concurrency level"""
+    fixture = FixtureServer(projects=args.projects, pages=args.pages, page_size=args.page_size,
+                            attachments=args.attachments, latency=args.latency).start()
+    total_pages = args.projects * args.pages
+    print(f"{total_pages} pages of {args.page_size} bytes with {args.attachments} attachments each, "
+          f"{args.latency * 1000:.0f} ms server latency per request")
+    print(f"{'engine':<9} {'workers':>7} {'time':>9} {'pages/s':>9} {'peak RSS':>10}")
+    status = 0
+    try:
+        for workers in args.workers:
+            for engine in ("threads", "asyncio"):
+                results = [measure_download(fixture, engine, workers) for _ in range(args.runs)]
+                if any(result['pages'] != total_pages or result['failed'] or result['exit_code'] for result in results):
+                    print(f"{engine} with {workers} workers did not download every page: {results}")
+                    status = 1
+                elapsed = statistics.median(result['elapsed'] for result in results)
+                peaks = [result['peak_rss'] for result in results if result['peak_rss']]
+                peak = f"{max(peaks) / 1024 ** 2:7.1f} MB" if peaks else "       n/a"
+                print(f"{engine:<9} {workers:>7} {elapsed:8.2f}s {total_pages / elapsed:9.1f} {peak:>10}")
+    finally:
+        fixture.stop()
+    return status
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Redmine Wiki downloader benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    startup = commands.add_parser("startup", help="Cold-start time to first window and to first request")
+    startup.add_argument("--runs", type=int, default=5, help="Number of launches to measure")
+    startup.add_argument("--executable", help="Measure a frozen build instead of main.py (headless only)")
+    startup.add_argument("--timeout", type=float, default=60, help="Seconds to wait for each launch")
+    startup.set_defaults(handler=run_startup)
+
+    convert = commands.add_parser("convert", help="Page conversion throughput by process pool size")
+    convert.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4],
+                         help="Process pool sizes to compare, 0 = in the calling thread")
+    convert.add_argument("--pages", type=int, default=400, help="Pages to convert")
+    convert.add_argument("--page-size", type=int, default=64 * 1024, help="Wiki text size of each page in bytes")
+    convert.add_argument("--attachments", type=int, default=20, help="Attachments (image links) per page")
+    convert.add_argument("--batch", type=int, default=8, help="Pages sent to a worker process at once")
+    convert.add_argument("--runs", type=int, default=3, help="Repetitions, the median is reported")
+    convert.set_defaults(handler=run_convert)
+
+    cancel = commands.add_parser("cancel", help="Time from Ctrl+C to idle workers and process exit")
+    cancel.add_argument("--runs", type=int, default=3, help="Cancels to measure per scenario")
+    cancel.add_argument("--timeout", type=float, default=60, help="Seconds to wait for each step")
+    cancel.add_argument("--engines", nargs="+", choices=["threads", "asyncio"], default=["threads", "asyncio"],
+                        help="Download engines to measure")
+    cancel.set_defaults(handler=run_cancel)
+
+    engines = commands.add_parser("engines", help="Threaded versus asyncio download engine")
+    engines.add_argument("--workers", type=int, nargs="+", default=[16, 256],
+                         help="Concurrent page downloads to compare")
+    engines.add_argument("--projects", type=int, default=2, help="Projects on the fixture server")
+    engines.add_argument("--pages", type=int, default=500, help="Wiki pages per project")
+    engines.add_argument("--page-size", type=int, default=1000, help="Wiki text size of each page in bytes")
+    engines.add_argument("--attachments", type=int, default=0, help="Attachments per page")
+    engines.add_argument("--latency", type=float, default=0.02, help="Seconds the server takes per request")
+    engines.add_argument("--runs", type=int, default=1, help="Repetitions, the median time is reported")
+    engines.set_defaults(handler=run_engines)
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(args.handler(args))
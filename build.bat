@@ -3,16 +3,8 @@ chcp 65001
 echo Redmine Wiki Downloader Build Script
 echo.
 
-echo 1. Installing PyInstaller...
-python -m pip install pyinstaller
+rem Options are passed through to build.py, e.g. "build.bat --onedir"
+python build.py %*
 
 echo.
-echo 2. Building executable...
-pyinstaller --onefile --windowed --name "RedmineWikiDownloader" --icon=favicon.ico main.py
-
-echo.
-echo 3. Build Complete!
-echo Executable location: dist\RedmineWikiDownloader.exe
-echo.
-
-pause
\ No newline at end of file
+pause
@@ -1,39 +1,1421 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-import xml.etree.ElementTree as ET
+# Heavy modules (tkinter, requests, xml, profilers) are imported where they are
+# first needed so the window, or the first request in headless mode, comes up fast
 import os
 import re
-import subprocess
-import platform
+import json
+import hashlib
+import io
+import contextlib
+import functools
+import argparse
 import sys
 import threading
 import time
+from collections import deque
+from importlib.util import find_spec
 from typing import Optional, List, Dict
-from urllib.parse import quote
+from urllib.parse import quote, unquote, urlencode, urljoin, urlsplit
+
+
+def import_tkinter():
+    """Import tkinter for GUI runs only, headless runs never load it"""
+    global tk, ttk, filedialog, messagebox
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox
+
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RUN_METRICS_FILENAME = "run_metrics.json"
+
+
+class RunJournal:
+    """Append-only journal of completed work, used to resume interrupted runs"""
+
+    FILENAME = ".download_journal.jsonl"
+
+    def __init__(self, save_dir: str, resume: bool = False):
+        self.path = os.path.join(save_dir, self.FILENAME)
+        self.completed = set()
+        self.failed = set()
+        self.lock = threading.Lock()
+        # fsync runs under sync_lock only, so is_done is not held up by the disk. One
+        # fsync covers every entry written before it, concurrent records share it
+        self.sync_lock = threading.Lock()
+        self.written = 0
+        self.synced = 0
+
+        os.makedirs(save_dir, exist_ok=True)
+        if resume:
+            self.load()
+        else:
+            # Start a fresh journal for a new run
+            open(self.path, 'w', encoding='utf-8').close()
+
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.record("run", status="started")
+
+    def load(self):
+        """Replay journal entries written by a previous run"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Partial line written when the previous run died
+
+                key = self.make_key(entry.get('event'), entry.get('project'),
+                                    entry.get('page'), entry.get('attachment'))
+                if entry.get('status') == "done":
+                    self.completed.add(key)
+                    self.failed.discard(key)
+                elif entry.get('status') == "failed":
+                    self.failed.add(key)
+
+    @staticmethod
+    def make_key(event: str, project: Optional[str] = None, page: Optional[str] = None,
+                 attachment: Optional[str] = None) -> tuple:
+        return (event, project, page, attachment)
+
+    def is_done(self, event: str, project: str, page: Optional[str] = None,
+                attachment: Optional[str] = None) -> bool:
+        """Check whether an item was completed by this or a previous run"""
+        with self.lock:
+            return self.make_key(event, project, page, attachment) in self.completed
+
+    def record(self, event: str, project: Optional[str] = None, page: Optional[str] = None,
+               attachment: Optional[str] = None, status: str = "done"):
+        """Append an entry and flush it to disk immediately"""
+        entry = {"event": event, "status": status, "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        if project is not None:
+            entry["project"] = project
+        if page is not None:
+            entry["page"] = page
+        if attachment is not None:
+            entry["attachment"] = attachment
+
+        key = self.make_key(event, project, page, attachment)
+        with self.lock:
+            if status == "done":
+                self.completed.add(key)
+                self.failed.discard(key)
+            elif status == "failed":
+                self.failed.add(key)
+
+            self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.file.flush()
+            self.written += 1
+            position = self.written
+
+        with self.sync_lock:
+            if self.synced >= position:
+                return  # Made durable by the fsync of another thread
+            with self.lock:
+                if self.file.closed:
+                    return
+                fd = self.file.fileno()
+                position = self.written
+            os.fsync(fd)
+            self.synced = position
+
+    def truncate(self):
+        """Drop every entry, once the progress they record is kept elsewhere (the watch cursor)"""
+        with self.lock:
+            self.completed.clear()
+            self.failed.clear()
+            self.file.seek(0)
+            self.file.truncate()
+        self.record("run", status="started")
+
+    def close(self):
+        with self.sync_lock, self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+class DownloadCancelled(Exception):
+    """Raised in download workers once the run has been cancelled"""
+
+
+class CancelToken:
+    """Cooperative cancellation shared by all download workers of a run
+
+    Sockets opened by a worker inside tracking() are shut down on cancel, so a
+    worker blocked on a hung request or a large transfer wakes up right away
+    instead of when the transfer finishes.
+    """
+
+    local = threading.local()
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.sockets = {}  # thread id -> {'depth': nesting of tracking(), 'sockets': [...]}
+        self.callbacks = []
+        self.cancelled_at = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+    def cancel(self):
+        import socket
+
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.cancelled_at = time.monotonic()
+            self.event.set()
+            sockets = [sock for entry in self.sockets.values() for sock in entry['sockets']]
+            callbacks = list(self.callbacks)
+
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # Already closed
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback):
+        """Call callback from the cancelling thread on cancel, right away if already cancelled"""
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+    def elapsed(self) -> Optional[float]:
+        """Seconds since cancel() was called, None if not cancelled"""
+        if self.cancelled_at is None:
+            return None
+        return time.monotonic() - self.cancelled_at
+
+    def raise_if_cancelled(self):
+        if self.event.is_set():
+            raise DownloadCancelled()
+
+    def sleep(self, seconds: float):
+        """Sleep that ends early with DownloadCancelled when the run is cancelled"""
+        if self.event.wait(seconds):
+            raise DownloadCancelled()
+
+    @contextlib.contextmanager
+    def tracking(self):
+        """Register sockets this thread opens until the block ends, blocks may be nested"""
+        self.raise_if_cancelled()
+        ident = threading.get_ident()
+        with self.lock:
+            entry = self.sockets.setdefault(ident, {'depth': 0, 'sockets': []})
+            entry['depth'] += 1
+        previous = getattr(self.local, 'token', None)
+        self.local.token = self
+        try:
+            yield
+        finally:
+            self.local.token = previous
+            with self.lock:
+                entry['depth'] -= 1
+                if entry['depth'] == 0:
+                    del self.sockets[ident]
+
+    @classmethod
+    def register_socket(cls, sock):
+        """Called for each new connection, tracked by the token of the current thread if any"""
+        token = getattr(cls.local, 'token', None)
+        if token is None:
+            return
+
+        with token.lock:
+            if not token.event.is_set():
+                token.sockets[threading.get_ident()]['sockets'].append(sock)
+                return
+
+        # Cancelled while connecting, the request fails on its first read or write
+        import socket
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+@functools.lru_cache(maxsize=None)
+def cancellable_adapter_class():
+    """requests transport adapter whose connections register their sockets with CancelToken"""
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class TrackedHTTPConnection(HTTPConnection):
+        def connect(self):
+            super().connect()
+            CancelToken.register_socket(self.sock)
+
+    class TrackedHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            super().connect()
+            CancelToken.register_socket(self.sock)
+
+    class TrackedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TrackedHTTPConnection
+
+    class TrackedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TrackedHTTPSConnection
+
+    pool_classes = {'http': TrackedHTTPConnectionPool, 'https': TrackedHTTPSConnectionPool}
+
+    class CancellableAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = pool_classes
+
+        def proxy_manager_for(self, *args, **kwargs):
+            manager = super().proxy_manager_for(*args, **kwargs)
+            manager.pool_classes_by_scheme = pool_classes
+            return manager
+
+    return CancellableAdapter
+
+
+def cancellable_session():
+    """New requests session (as requests.get uses internally) with cancellable connections"""
+    import requests
+
+    session = requests.Session()
+    adapter_class = cancellable_adapter_class()
+    session.mount("http://", adapter_class())
+    session.mount("https://", adapter_class())
+    return session
+
+
+def requests_ssl_context():
+    """SSL context verifying against the same CA bundle as requests
+
+    Like requests, REQUESTS_CA_BUNDLE or CURL_CA_BUNDLE (a file or a directory)
+    override certifi's bundle. SSL_CERT_FILE is honoured too, e.g. for a
+    corporate CA.
+    """
+    import ssl
+
+    bundle = (os.environ.get('REQUESTS_CA_BUNDLE') or os.environ.get('CURL_CA_BUNDLE')
+              or os.environ.get('SSL_CERT_FILE'))
+    if bundle:
+        if os.path.isdir(bundle):
+            return ssl.create_default_context(capath=bundle)
+        return ssl.create_default_context(cafile=bundle)
 
-def install_required_packages():
-    """Automatically install required packages if not available"""
     try:
-        import requests
+        import certifi  # The CA bundle requests verifies against by default
+        return ssl.create_default_context(cafile=certifi.where())
     except ImportError:
-        print("Installing requests library...")
+        return ssl.create_default_context()
+
+
+class HttpStatusError(Exception):
+    """Error status from AsyncHttpClient, carries the response like requests.HTTPError"""
+
+    def __init__(self, message: str, response: "AsyncResponse"):
+        super().__init__(message)
+        self.response = response
+
+
+class AsyncResponse:
+    """Response of AsyncHttpClient.get, content is read unless the request was streamed"""
+
+    def __init__(self, client: "AsyncHttpClient", key: tuple, url: str, status_code: int, reason: str,
+                 headers: Dict, reader, writer, keep_alive: bool):
+        self.client = client
+        self.key = key
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.reader = reader
+        self.writer = writer
+        self.keep_alive = keep_alive
+        self.content = None
+
+        self.chunked = 'chunked' in headers.get('transfer-encoding', "").lower()
+        if status_code in (204, 304):
+            self.length = 0
+        elif not self.chunked and 'content-length' in headers:
+            self.length = int(headers['content-length'])
+        else:
+            self.length = None
+            self.keep_alive = self.keep_alive and self.chunked  # Body ends when the server closes
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise HttpStatusError(f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}", self)
+
+    async def read(self) -> bytes:
+        self.content = b"".join([chunk async for chunk in self.iter_content(64 * 1024)])
+        return self.content
+
+    async def iter_content(self, chunk_size: int = 8192):
+        """Yield the body, the connection goes back to the client's pool once it is fully read"""
+        try:
+            async for chunk in self.body_chunks(chunk_size):
+                yield chunk
+        except BaseException:
+            self.close()
+            raise
+        self.release()
+
+    async def body_chunks(self, chunk_size: int):
+        reader = self.reader
+        if self.chunked:
+            # A connection closed anywhere before the final 0-size chunk and the blank
+            # line after the trailers is a truncated body, not the end of the message
+            while True:
+                line = await reader.readline()
+                try:
+                    size = int(line.split(b";")[0].strip(), 16)  # Chunk extensions follow ';'
+                except ValueError:
+                    raise ConnectionError(f"Invalid or missing chunk size in response: {self.url}") from None
+                if size == 0:
+                    # Skip trailers up to the blank line ending the message
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n"):
+                            return
+                        if not line:
+                            raise ConnectionError(f"Connection closed before the response was complete: {self.url}")
+                async for chunk in self.read_exactly(size, chunk_size):
+                    yield chunk
+                if (await reader.readline()) not in (b"\r\n", b"\n"):
+                    raise ConnectionError(f"Missing CRLF after a chunk in response: {self.url}")
+        elif self.length is not None:
+            async for chunk in self.read_exactly(self.length, chunk_size):
+                yield chunk
+        else:
+            while True:
+                chunk = await reader.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    async def read_exactly(self, size: int, chunk_size: int):
+        while size > 0:
+            chunk = await self.reader.read(min(chunk_size, size))
+            if not chunk:
+                raise ConnectionError(f"Connection closed before the response was complete: {self.url}")
+            size -= len(chunk)
+            yield chunk
+
+    def release(self):
+        if self.writer is None:
+            return
+        if self.keep_alive:
+            self.client.release(self.key, self.reader, self.writer)
+        else:
+            self.writer.close()
+        self.writer = None
+
+    def close(self):
+        """Drop the connection unless the body was read completely"""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class AsyncHttpClient:
+    """Minimal HTTP/1.1 GET client on asyncio streams for the asyncio engine
+
+    Supports what the Redmine REST API needs: query parameters, basic auth,
+    redirects, Content-Length and chunked bodies, and keeps idle connections
+    alive per host. It connects directly, proxies are not supported.
+    """
+
+    MAX_REDIRECTS = 10
+
+    def __init__(self):
+        self.idle = {}  # (scheme, host, port) -> [(reader, writer)]
+        self.ssl_context = None
+
+    async def get(self, url: str, params: Optional[Dict] = None, auth: Optional[tuple] = None,
+                  stream: bool = False) -> AsyncResponse:
+        if params:
+            url = f"{url}{'&' if urlsplit(url).query else '?'}{urlencode(params)}"
+
+        for _ in range(self.MAX_REDIRECTS + 1):
+            response = await self.request(url, auth)
+            location = response.headers.get('location')
+            if response.status_code not in (301, 302, 303, 307, 308) or not location:
+                if not stream:
+                    await response.read()
+                return response
+
+            await response.read()  # Drain the body so the connection can be reused
+            redirect_url = urljoin(url, location)
+            if urlsplit(redirect_url).netloc != urlsplit(url).netloc:
+                auth = None  # Like requests, do not send credentials to another host
+            url = redirect_url
+
+        raise ConnectionError(f"Exceeded {self.MAX_REDIRECTS} redirects: {url}")
+
+    async def request(self, url: str, auth: Optional[tuple]) -> AsyncResponse:
+        import asyncio
+        import base64
+
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = quote(parts.path or "/", safe="!#$%&'()*+,/:;=?@[]~")
+        if parts.query:
+            target += "?" + quote(parts.query, safe="!#$%&'()*+,/:;=?@[]~")
+
+        lines = [f"GET {target} HTTP/1.1", f"Host: {parts.netloc.rsplit('@', 1)[-1]}",
+                 "User-Agent: RedmineWikiDownloader", "Accept: */*", "Accept-Encoding: identity",
+                 "Connection: keep-alive"]
+        if auth:
+            credentials = base64.b64encode(f"{auth[0]}:{auth[1]}".encode('utf-8')).decode('ascii')
+            lines.append(f"Authorization: Basic {credentials}")
+        message = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+
+        for attempt in range(2):
+            reader, writer, reused = await self.connect(key)
+            try:
+                writer.write(message)
+                await writer.drain()
+
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionResetError(f"Connection closed by server: {url}")
+                version, status, reason = (status_line.decode('latin-1').rstrip("\r\n").split(" ", 2) + [""])[:3]
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused and attempt == 0:
+                    continue  # The server closed an idle keep-alive connection, retry on a new one
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            keep_alive = version == "HTTP/1.1" and headers.get('connection', "").lower() != "close"
+            return AsyncResponse(self, key, url, int(status), reason, headers, reader, writer, keep_alive)
+
+    async def connect(self, key: tuple) -> tuple:
+        """(reader, writer, reused) for an idle or new connection"""
+        import asyncio
+
+        idle = self.idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+
+        ssl_context = None
+        if key[0] == "https":
+            if self.ssl_context is None:
+                self.ssl_context = requests_ssl_context()
+            ssl_context = self.ssl_context
+
+        reader, writer = await asyncio.open_connection(key[1], key[2], ssl=ssl_context)
+        return reader, writer, False
+
+    def release(self, key: tuple, reader, writer):
+        self.idle.setdefault(key, []).append((reader, writer))
+
+    def close(self):
+        for connections in self.idle.values():
+            for _, writer in connections:
+                writer.close()
+        self.idle = {}
+
+
+class TokenBucket:
+    """Thread-safe token bucket, a rate of 0 means unlimited"""
+
+    def __init__(self, rate: float = 0):
+        self.lock = threading.Lock()
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def set_rate(self, rate: float):
+        with self.lock:
+            if rate != self.rate:
+                self.rate = rate
+                self.tokens = min(self.tokens, rate)
+
+    def reserve(self, amount: float = 1) -> float:
+        """Take tokens, returns the seconds to wait before using them"""
+        with self.lock:
+            now = time.monotonic()
+            if self.rate <= 0:
+                self.updated = now
+                return 0
+
+            # Allow up to one second of burst
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            # Reserve tokens up front (going into debt for large amounts) so waiting
+            # workers are served in order and the allowed rate is fully used
+            self.tokens -= amount
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def acquire(self, amount: float = 1, cancel: Optional[CancelToken] = None):
+        """Take tokens, sleeping until the bucket has refilled enough or cancel is cancelled"""
+        wait = self.reserve(amount)
+        if wait > 0:
+            if cancel is not None:
+                cancel.sleep(wait)
+            else:
+                time.sleep(wait)
+
+
+class RateLimiter:
+    """Request rate and bandwidth limits shared by all download workers"""
+
+    def __init__(self, requests_per_sec: float = 0, bytes_per_sec: float = 0, windows: Optional[List[Dict]] = None):
+        self.default_limits = (requests_per_sec, bytes_per_sec)
+        self.windows = windows or []
+        self.request_bucket = TokenBucket()
+        self.byte_bucket = TokenBucket()
+        self.update_limits()
+
+    def current_limits(self) -> tuple:
+        """Return (requests per second, bytes per second) for the current time of day"""
+        now = time.localtime()
+        minute = now.tm_hour * 60 + now.tm_min
+
+        for window in self.windows:
+            start, end = window['start'], window['end']
+            if start <= end:
+                in_window = start <= minute < end
+            else:  # Window crosses midnight
+                in_window = minute >= start or minute < end
+            if in_window:
+                return window['requests_per_sec'], window['bytes_per_sec']
+
+        return self.default_limits
+
+    def update_limits(self):
+        requests_per_sec, bytes_per_sec = self.current_limits()
+        self.request_bucket.set_rate(requests_per_sec)
+        self.byte_bucket.set_rate(bytes_per_sec)
+
+    def acquire_request(self, cancel: Optional[CancelToken] = None):
+        self.update_limits()
+        self.request_bucket.acquire(cancel=cancel)
+
+    def acquire_bytes(self, size: int, cancel: Optional[CancelToken] = None):
+        self.byte_bucket.acquire(size, cancel)
+
+    def reserve_request(self) -> float:
+        """Non-blocking acquire_request for the asyncio engine, returns the seconds to wait"""
+        self.update_limits()
+        return self.request_bucket.reserve()
+
+    def reserve_bytes(self, size: int) -> float:
+        return self.byte_bucket.reserve(size)
+
+
+class ContentManifest:
+    """Sidecar manifest of content digests, used to skip rewriting unchanged files"""
+
+    FILENAME = ".manifest.json"
+
+    def __init__(self, save_dir: str):
+        self.save_dir = save_dir
+        self.path = os.path.join(save_dir, self.FILENAME)
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.dirty = True  # Entries differ from the manifest file, cleared by save()
+        self.reset_counts()
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+                self.dirty = False
+            except ValueError:
+                self.entries = {}  # Rebuilt from the files written by this run
+
+    def key(self, path: str) -> str:
+        return os.path.relpath(path, self.save_dir).replace(os.sep, "/")
+
+    def reset_counts(self):
+        """Start counting written and skipped files for a new run"""
+        self.written_files = 0
+        self.written_bytes = 0
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+
+    def set_entry(self, path: str, entry: Dict):
+        key = self.key(path)
+        with self.lock:
+            if self.entries.get(key) != entry:
+                self.entries[key] = entry
+                self.dirty = True
+
+    def count(self, written: bool, size: int):
+        with self.lock:
+            if written:
+                self.written_files += 1
+                self.written_bytes += size
+            else:
+                self.skipped_files += 1
+                self.skipped_bytes += size
+
+    def holds(self, path: str, digest: str, size: int) -> bool:
+        """True if the file at path already has this content, by its manifest entry when there is one"""
+        with self.lock:
+            entry = self.entries.get(self.key(path))
+
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            return False
+        if entry is not None:
+            return entry.get('sha256') == digest
+        # File from a run without manifest, compare the content itself
+        return self.file_digest(path) == digest
+
+    def write_file(self, path: str, data: bytes, digest: Optional[str] = None) -> bool:
+        """Write data unless the file already holds the same content, returns True if written"""
+        digest = digest or hashlib.sha256(data).hexdigest()
+        unchanged = self.holds(path, digest, len(data))
+
+        if not unchanged:
+            # Replace atomically so an interrupted write never leaves a truncated page
+            temp_path = path + ".part"
+            try:
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+        self.set_entry(path, {'sha256': digest, 'size': len(data)})
+        self.count(not unchanged, len(data))
+        return not unchanged
+
+    def commit_file(self, path: str, temp_path: str, digest: str, size: int) -> bool:
+        """write_file for content already written to temp_path, returns True if path was replaced"""
         try:
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'requests>=2.31.0'])
-            print("requests library installed successfully!")
-            import requests
+            unchanged = self.holds(path, digest, size)
+            if unchanged:
+                os.remove(temp_path)  # Keep the existing file and its mtime
+            else:
+                os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.set_entry(path, {'sha256': digest, 'size': size})
+        self.count(not unchanged, size)
+        return not unchanged
+
+    def is_unchanged_attachment(self, path: str, attachment: Dict) -> bool:
+        """Redmine attachments are immutable, so a matching id, digest and size means nothing to fetch"""
+        with self.lock:
+            entry = self.entries.get(self.key(path))
+
+        if (entry is None or entry.get('attachment_id') != attachment['id']
+                or entry.get('digest', "") != attachment.get('digest', "")
+                or not os.path.exists(path) or os.path.getsize(path) != entry.get('size')):
+            return False
+
+        self.count(False, entry['size'])
+        return True
+
+    def write_stream(self, path: str, chunks, attachment: Optional[Dict] = None) -> bool:
+        """Stream chunks to a temporary file and only replace path if the content changed"""
+        with PartFile(path) as part:
+            for chunk in chunks:
+                part.write(chunk)
+        return self.commit_part(part, attachment)
+
+    def commit_part(self, part: "PartFile", attachment: Optional[Dict] = None) -> bool:
+        """Move a completely written PartFile into place, returns True if the content changed"""
+        path = part.path
+        digest = part.sha256.hexdigest()
+        size = part.size
+        try:
+            unchanged = (os.path.exists(path) and os.path.getsize(path) == size
+                         and self.file_digest(path) == digest)
+            if unchanged:
+                os.remove(part.temp_path)  # Keep the existing file and its mtime
+            else:
+                os.replace(part.temp_path, path)
+        except BaseException:
+            part.discard()
+            raise
+
+        entry = {'sha256': digest, 'size': size}
+        if attachment is not None:
+            entry['attachment_id'] = attachment.get('attachment')
+            entry['digest'] = attachment.get('digest', "")
+        self.set_entry(path, entry)
+        self.count(not unchanged, size)
+        return not unchanged
+
+    @staticmethod
+    def file_digest(path: str) -> str:
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(block)
+        return sha256.hexdigest()
+
+    def save(self):
+        """Replace the manifest file atomically, if any entry changed since it was loaded or saved"""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = json.dumps(self.entries, ensure_ascii=False, indent=1, sort_keys=True)
+            self.dirty = False
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            with self.lock:
+                self.dirty = True
+            raise
+
+
+class PartFile:
+    """Temporary path.part file that hashes what is written, removed if its block raises"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.temp_path = path + ".part"
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.file = None
+
+    def __enter__(self) -> "PartFile":
+        self.file = open(self.temp_path, 'wb')
+        return self
+
+    def write(self, chunk: bytes):
+        self.sha256.update(chunk)
+        self.size += len(chunk)
+        self.file.write(chunk)
+
+    def discard(self):
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.file.close()
+        if exc_type is not None:
+            self.discard()
+        return False
+
+
+class ProgressTracker:
+    """Progress measured against planned work, with moving-average throughput and ETA"""
+
+    DEFAULT_PAGE_BYTES = 4096  # Estimated page size until the first page is downloaded
+    WINDOW_SECONDS = 30
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.planned_pages = 0
+        self.done_pages = 0
+        self.page_bytes = 0
+        self.listed_pages = 0
+        self.planned_attachment_bytes = 0
+        self.done_attachment_bytes = 0
+        self.samples = deque([(self.started, 0, 0, 0.0)])
+
+    def plan_pages(self, count: int):
+        """Add pages found in a wiki index to the planned work"""
+        with self.lock:
+            self.planned_pages += count
+
+    def plan_attachments(self, size: int):
+        """Add attachment sizes of a fetched page to the planned work"""
+        with self.lock:
+            self.listed_pages += 1
+            self.planned_attachment_bytes += size
+
+    def add_page_bytes(self, size: int):
+        with self.lock:
+            self.page_bytes += size
+
+    def add_attachment_bytes(self, size: int):
+        with self.lock:
+            self.done_attachment_bytes += size
+
+    def page_done(self):
+        with self.lock:
+            self.done_pages += 1
+
+    def fraction(self) -> float:
+        """Completed share of the planned work (caller holds lock)"""
+        average_page_bytes = self.page_bytes / self.done_pages if self.done_pages else self.DEFAULT_PAGE_BYTES
+        # Attachments of pages not fetched yet are estimated from the pages seen so far
+        average_attachment_bytes = self.planned_attachment_bytes / self.listed_pages if self.listed_pages else 0
+        unlisted_pages = max(self.planned_pages - self.listed_pages, 0)
+
+        total = (self.planned_pages * average_page_bytes + self.planned_attachment_bytes
+                 + unlisted_pages * average_attachment_bytes)
+        done = (min(self.done_pages, self.planned_pages) * average_page_bytes
+                + min(self.done_attachment_bytes, self.planned_attachment_bytes))
+        return min(done / total, 1.0) if total else 0.0
+
+    def snapshot(self) -> Dict:
+        """Current progress, throughput over the moving window and ETA"""
+        with self.lock:
+            now = time.monotonic()
+            fraction = self.fraction()
+            received_bytes = self.page_bytes + self.done_attachment_bytes
+
+            self.samples.append((now, self.done_pages, received_bytes, fraction))
+            while len(self.samples) > 2 and now - self.samples[1][0] >= self.WINDOW_SECONDS:
+                self.samples.popleft()
+
+            window_start, window_pages, window_bytes, window_fraction = self.samples[0]
+            window = now - window_start
+            elapsed = now - self.started
+
+            eta_seconds = None
+            if window > 0 and fraction > window_fraction:
+                eta_seconds = (1.0 - fraction) / ((fraction - window_fraction) / window)
+
+            return {
+                'fraction': fraction,
+                'pages_done': self.done_pages,
+                'pages_planned': self.planned_pages,
+                'bytes_received': received_bytes,
+                'pages_per_sec': (self.done_pages - window_pages) / window if window > 0 else 0.0,
+                'bytes_per_sec': (received_bytes - window_bytes) / window if window > 0 else 0.0,
+                'eta_seconds': eta_seconds,
+                'elapsed_seconds': elapsed,
+                'average_pages_per_sec': self.done_pages / elapsed if elapsed > 0 else 0.0,
+                'average_bytes_per_sec': received_bytes / elapsed if elapsed > 0 else 0.0
+            }
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def format_throughput(stats: Dict) -> str:
+    """One line meter shown on the progress screen and in headless logs"""
+    return (f"{stats['pages_per_sec']:.1f} pages/s | {stats['bytes_per_sec'] / 1024 ** 2:.2f} MB/s | "
+            f"ETA {format_duration(stats['eta_seconds'])}")
+
+
+class PhaseProfiler:
+    """cProfile and tracemalloc measurements per download phase, disabled without output_dir"""
+
+    PHASES = ("listing", "fetch", "parse", "convert", "write")
+    TOP_COUNT = 15
+    SAMPLE_EVERY = 50
+
+    def __init__(self, output_dir: Optional[str] = None):
+        self.output_dir = output_dir
+        self.enabled = output_dir is not None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.profiles = {}
+        self.totals = {phase: {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'net_bytes': 0, 'peak_bytes': 0}
+                       for phase in self.PHASES}
+        self.allocations = {}
+        self.allocation_growth = {}
+
+        if self.enabled:
+            import cProfile
+            import tracemalloc
+            self.profiles = {phase: cProfile.Profile() for phase in self.PHASES}
+            tracemalloc.start(10)
+
+    def phase(self, name: str):
+        """Context manager measuring the enclosed code as the given phase"""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self.measure(name)
+
+    @contextlib.contextmanager
+    def measure(self, name: str):
+        import tracemalloc
+
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+
+        # Phases are exclusive: a nested phase pauses the enclosing one
+        outer = stack[-1] if stack else None
+        switch = outer != name
+        if switch:
+            self.switch(outer, None)
+
+        # Snapshots are taken outside of any profiled phase
+        entry_snapshot = self.take_snapshot() if switch and self.should_sample(name) else None
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+
+        if switch:
+            self.switch(None, name)
+        stack.append(name)
+        try:
+            yield
+        finally:
+            if switch:
+                self.switch(name, None)
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            stack.pop()
+
+            top_allocations = None
+            if entry_snapshot is not None:
+                top_allocations = self.take_snapshot().compare_to(entry_snapshot, 'lineno')[:self.TOP_COUNT]
+
+            with self.lock:
+                totals = self.totals[name]
+                totals['calls'] += 1
+                totals['net_bytes'] += current_memory - start_memory
+                totals['peak_bytes'] = max(totals['peak_bytes'], peak_memory - start_memory)
+
+                # Keep the sampled occurrence that allocated the most
+                if top_allocations is not None:
+                    growth = sum(stat.size_diff for stat in top_allocations if stat.size_diff > 0)
+                    if growth >= self.allocation_growth.get(name, 0):
+                        self.allocation_growth[name] = growth
+                        self.allocations[name] = top_allocations
+
+            if switch:
+                self.switch(None, outer)
+
+    def should_sample(self, name: str) -> bool:
+        """Allocation snapshots are expensive, so only some occurrences of a phase are sampled"""
+        with self.lock:
+            calls = self.totals[name]['calls']
+        return calls < 3 or calls % self.SAMPLE_EVERY == 0
+
+    @staticmethod
+    def take_snapshot():
+        import tracemalloc
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+    def switch(self, old: Optional[str], new: Optional[str]):
+        """Stop profiling and timing old, start new"""
+        now = time.perf_counter()
+        cpu_now = time.thread_time()
+        if old is not None:
+            self.profiles[old].disable()
+            with self.lock:
+                self.totals[old]['wall'] += now - self.local.started
+                self.totals[old]['cpu'] += cpu_now - self.local.cpu_started
+        if new is not None:
+            self.local.started = now
+            self.local.cpu_started = cpu_now
+            try:
+                self.profiles[new].enable()
+            except ValueError:
+                pass  # Another thread is profiling (Python 3.12+ allows one profiler at a time)
+
+    def stop(self):
+        """Stop tracing allocations, for runs that end without a report"""
+        if self.enabled:
+            import tracemalloc
+            tracemalloc.stop()
+
+    def write_report(self) -> Optional[str]:
+        """Write pstats, allocation snapshots and a text report, returns the report path"""
+        if not self.enabled:
+            return None
+
+        import pstats
+        import tracemalloc
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        report = io.StringIO()
+        report.write("Phase      Calls     Wall(s)   CPU(s)    Peak(MB)  Net(MB)\n")
+        for phase in self.PHASES:
+            totals = self.totals[phase]
+            report.write(f"{phase:<10} {totals['calls']:<9} {totals['wall']:<9.2f} {totals['cpu']:<9.2f} "
+                         f"{totals['peak_bytes'] / 1024 ** 2:<9.2f} {totals['net_bytes'] / 1024 ** 2:.2f}\n")
+
+        for phase in self.PHASES:
+            if not self.totals[phase]['calls']:
+                continue
+
+            self.profiles[phase].dump_stats(os.path.join(self.output_dir, f"{phase}.pstats"))
+
+            report.write(f"\n== {phase}: top functions by own time ==\n")
+            stats = pstats.Stats(self.profiles[phase], stream=report)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(5)
+
+            top_allocations = self.allocations.get(phase)
+            if top_allocations is not None:
+                with open(os.path.join(self.output_dir, f"{phase}.alloc.txt"), 'w', encoding='utf-8') as f:
+                    for statistic in top_allocations:
+                        f.write(f"{statistic}\n")
+
+                report.write(f"== {phase}: top allocations (sampled, including nested phases) ==\n")
+                for statistic in top_allocations[:5]:
+                    report.write(f"{statistic}\n")
+
+        tracemalloc.stop()
+        report_path = os.path.join(self.output_dir, "report.txt")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+        return report_path
+
+
+def profiled(phase: str):
+    """Run the decorated downloader method as a profiler phase"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.profiler.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def in_shard(identifier: str, shard: Optional[Dict]) -> bool:
+    """Assign projects to shards by a stable hash of the project identifier"""
+    if shard is None:
+        return True
+    return int(hashlib.sha1(identifier.encode('utf-8')).hexdigest(), 16) % shard['count'] == shard['index']
+
+
+def parse_feed_time(text: Optional[str]):
+    """Atom timestamp as an aware datetime, Redmine writes local time with its UTC offset"""
+    from datetime import datetime, timezone
+
+    if not text:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    value = datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def shard_prefix(shard_dir: str, output_dir: str) -> str:
+    """Prefix turning a key of a shard manifest into one relative to output_dir"""
+    try:
+        prefix = os.path.relpath(shard_dir, output_dir)
+    except ValueError:
+        prefix = os.path.abspath(shard_dir)  # Different drive on Windows
+    prefix = prefix.replace(os.sep, "/")
+    return "" if prefix == "." else prefix + "/"
+
+
+def merge_shards(shard_dirs: List[str], output_dir: str) -> int:
+    """Combine shard manifests and metrics into one backup index, returns process exit code
+
+    Files stay in their shard directories. Keys of the merged manifest are
+    relative to output_dir, so they point into the shard that holds each file.
+    """
+    merged_manifest = {}
+    shard_keys = {}  # Key within a shard -> (shard dir, sha256), the same file must not come from two shards
+    shards = []
+    owners = {}
+    problems = []
+
+    for shard_dir in shard_dirs:
+        metrics_path = os.path.join(shard_dir, RUN_METRICS_FILENAME)
+        manifest_path = os.path.join(shard_dir, ContentManifest.FILENAME)
+        if not os.path.exists(metrics_path) or not os.path.exists(manifest_path):
+            problems.append(f"'{shard_dir}' has no {RUN_METRICS_FILENAME} or {ContentManifest.FILENAME}")
+            continue
+
+        with open(metrics_path, 'r', encoding='utf-8') as f:
+            metrics = json.load(f)
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        shards.append(metrics)
+        for identifier in metrics.get('projects', []):
+            if identifier in owners:
+                problems.append(f"project '{identifier}' is in both '{owners[identifier]}' and '{shard_dir}'")
+            owners[identifier] = shard_dir
+
+        prefix = shard_prefix(shard_dir, output_dir)
+        for key, entry in manifest.items():
+            if key in shard_keys and shard_keys[key][1] != entry['sha256']:
+                problems.append(f"'{key}' differs between '{shard_keys[key][0]}' and '{shard_dir}'")
+            shard_keys[key] = (shard_dir, entry['sha256'])
+            merged_manifest[prefix + key] = entry
+
+    # Every shard of the same split must be present exactly once
+    counts = {metrics['shard']['count'] for metrics in shards if metrics.get('shard')}
+    indexes = sorted(metrics['shard']['index'] for metrics in shards if metrics.get('shard'))
+    if len(counts) > 1:
+        problems.append(f"shards come from different splits: {sorted(counts)}")
+    elif counts and indexes != list(range(counts.pop())):
+        problems.append(f"incomplete or duplicate shards: {indexes}")
+    if any(metrics.get('cancelled') for metrics in shards):
+        problems.append("one or more shard runs were cancelled")
+
+    totals = {}
+    for field in ('pages_done', 'pages_planned', 'bytes_received', 'files_written', 'bytes_written',
+                  'files_skipped', 'bytes_skipped', 'failed_items'):
+        totals[field] = sum(metrics.get(field, 0) for metrics in shards)
+    # Shards run side by side, so the backup takes as long as the slowest one
+    totals['elapsed_seconds'] = max((metrics.get('elapsed_seconds', 0) for metrics in shards), default=0)
+    totals['projects'] = sorted(owners)
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, ContentManifest.FILENAME), 'w', encoding='utf-8') as f:
+        json.dump(merged_manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    with open(os.path.join(output_dir, RUN_METRICS_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump({'merged': totals, 'shards': shards, 'problems': problems}, f, ensure_ascii=False, indent=2)
+
+    print(f"Merged {len(shards)} shards: {len(totals['projects'])} projects, {len(merged_manifest)} files, "
+          f"{totals['pages_done']} pages, {totals['failed_items']} failed items")
+    for problem in problems:
+        print(f"Warning: {problem}")
+
+    return 1 if problems else 0
+
+
+def sanitize_filename(filename: str) -> str:
+    """Remove special characters from filename"""
+    return re.sub(r'[<>:"/\\|?*]', '_', filename)
+
+
+def convert_image_links(text: str, attachments: List[Dict]) -> str:
+    """Convert Redmine image links to local markdown format"""
+    if not text or not attachments:
+        return text
+
+    # Create a mapping of attachment filenames
+    att_filenames = {att['filename']: att['filename'] for att in attachments}
+
+    def replace_image(match):
+        align = match.group(1) or ''  # Capture alignment (>, <, =)
+        filename = match.group(2)
+
+        # Check if this filename exists in attachments
+        if filename in att_filenames:
+            # Convert to markdown image syntax with relative path
+            return f"![{filename}](./{filename})"
+        return match.group(0)  # Return original if not found
+
+    # Replace Redmine image syntax with markdown: !filename.ext! or !>filename.ext!
+    return re.sub(r'!([><\-=])?([^!\s]+)!', replace_image, text)
+
+
+def render_page(page_title: str, page_text: str) -> bytes:
+    """Markdown file content, with the same newline handling as writing in text mode"""
+    content = f"# {page_title}\n\n{page_text}".replace("\n", os.linesep)
+    return content.encode('utf-8')
+
+
+def parse_attachments(root) -> List[Dict]:
+    """Attachment list of a wiki page fetched with include=attachments"""
+    attachments = []
+    for attachment in root.findall('.//attachment'):
+        attachments.append({
+            'id': attachment.find('id').text,
+            'filename': attachment.find('filename').text,
+            'content_url': attachment.find('content_url').text,
+            'filesize': int(attachment.findtext('filesize') or 0),
+            'digest': attachment.findtext('digest') or ""
+        })
+    return attachments
+
+
+def process_page(page_xml: bytes, phase=None) -> Dict:
+    """CPU-bound part of saving a wiki page: parse, rewrite image links, render and hash
+
+    page_xml is the page fetched with include=attachments, which carries both
+    the text and the attachment list.
+
+    phase is the profiler's phase context manager when called in the downloading
+    process, worker processes of the PageProcessor pass nothing.
+    """
+    import xml.etree.ElementTree as ET
+
+    phase = phase or (lambda name: contextlib.nullcontext())
+    with phase("parse"):
+        root = ET.fromstring(page_xml)
+        page_title = root.find('title').text
+        page_text = root.find('text').text or ""
+        attachments = parse_attachments(root)
+
+    with phase("convert"):
+        # Pages with attachments get a folder of their own, named after the page
+        folder = sanitize_filename(page_title) if attachments else None
+        if attachments:
+            page_text = convert_image_links(page_text, attachments)
+        content = render_page(page_title, page_text)
+
+    return {
+        'title': page_title,
+        'attachments': attachments,
+        'folder': folder,
+        'filename': f"{sanitize_filename(page_title)}.md",
+        'content': content,
+        'sha256': hashlib.sha256(content).hexdigest()
+    }
+
+
+def page_path(save_dir: str, page: Dict) -> str:
+    """Markdown file of a processed page, inside its folder if the page has attachments"""
+    if page['folder']:
+        return os.path.join(save_dir, page['folder'], page['filename'])
+    return os.path.join(save_dir, page['filename'])
+
+
+def process_page_to_file(page_xml: bytes, save_dir: str) -> Dict:
+    """process_page in a worker process, which writes the content to a .part file next to its path
+
+    The result carries part_path and size instead of the content, so only the
+    compact page description goes back through IPC. The downloading process
+    moves the part file into place with ContentManifest.commit_file.
+    """
+    page = process_page(page_xml)
+    content = page.pop('content')
+    path = page_path(save_dir, page)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    part_path = path + ".part"
+    try:
+        with open(part_path, 'wb') as f:
+            f.write(content)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+    page['part_path'] = part_path
+    page['size'] = len(content)
+    return page
+
+
+def process_page_batch(items: List[tuple]) -> List[tuple]:
+    """Worker process entry point, a page that fails does not fail the rest of its batch"""
+    results = []
+    for page_xml, save_dir in items:
+        try:
+            results.append((True, process_page_to_file(page_xml, save_dir)))
         except Exception as e:
-            print(f"Failed to install library: {e}")
-            sys.exit(1)
+            results.append((False, e))
+    return results
+
+
+class PageProcessor:
+    """Process pool running process_page_to_file for the download threads
+
+    Payloads that queue up while the pool is busy are sent to a worker together,
+    up to batch_size at a time, so IPC costs one round trip per batch instead of
+    one per page. A lone payload is sent right away rather than waiting for more.
+    """
+
+    def __init__(self, workers: int, batch_size: int = 8):
+        import multiprocessing
+        import queue
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.batch_size = max(1, batch_size)
+        self.queue = queue.Queue()
+        self.empty = queue.Empty
+        # Spawned workers do not inherit locks held by the download threads
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.dispatcher = threading.Thread(target=self.dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, page_xml: bytes, save_dir: str):
+        """Queue a page, returns a Future of the process_page_to_file result"""
+        from concurrent.futures import Future
+
+        future = Future()
+        self.queue.put(((page_xml, save_dir), future))
+        return future
+
+    def dispatch(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except self.empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
 
-install_required_packages()
-import requests
+            items = [page for page, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                batch_future = self.executor.submit(process_page_batch, items)
+            except Exception as e:
+                for future in futures:
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(e)
+                continue
+            batch_future.add_done_callback(functools.partial(self.deliver, futures))
+
+    @staticmethod
+    def deliver(futures: List, batch_future):
+        try:
+            results = batch_future.result()
+        except BaseException as e:
+            # Worker died or the pool was broken, fail every page of the batch
+            for future in futures:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+            return
+
+        for future, (ok, result) in zip(futures, results):
+            if not future.set_running_or_notify_cancel():
+                # Nobody will commit the page of a cancelled download
+                if ok and os.path.exists(result['part_path']):
+                    os.remove(result['part_path'])
+            elif ok:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+
+    def close(self):
+        self.queue.put(None)
+        self.dispatcher.join()
+        self.executor.shutdown(wait=True)
 
 
 class RedmineWikiDownloader:
+    FAILED_ITEMS_FILENAME = "failed_items.json"
+    CLOSE_TIMEOUT = 10  # Seconds to wait for workers to stop when the window is closed
+
     def __init__(self):
+        import platform
+
+        import_tkinter()
         self.root = tk.Tk()
         self.root.title("Redmine Wiki Downloader")
-        self.root.geometry("600x400")
+        self.root.geometry("600x430")
         self.root.resizable(False, False)
 
         # Set window icon
@@ -56,17 +1438,19 @@ class RedmineWikiDownloader:
         self.auth_mode = tk.StringVar(value="id_pw")  # "api_key" or "id_pw"
         self.save_path = tk.StringVar(value="./wiki")
         self.download_mode = tk.StringVar(value="project")
+        self.resume_run = tk.BooleanVar(value=False)
+        self.profile_run = tk.BooleanVar(value=False)
         self.error_message = tk.StringVar()
 
         # State
         self.projects_data = []
         self.selected_project = None
-        self.is_downloading = False
-        self.cancel_download = False
+        self.init_download_state()
 
         # Progress tracking
         self.current_status = tk.StringVar()
         self.progress_var = tk.DoubleVar()
+        self.throughput_text = tk.StringVar()
         self.current_url = tk.StringVar()
 
         self.setup_main_window()
@@ -74,6 +1458,34 @@ class RedmineWikiDownloader:
         # Window close event handling
         self.root.protocol("WM_DELETE_WINDOW", self.on_window_close)
 
+    def init_download_state(self):
+        """Initialize state shared by GUI and headless runs"""
+        self.is_downloading = False
+        self.cancel_token = CancelToken()
+        self.cancel_to_idle = None  # Seconds from cancel until every worker had stopped
+        self.journal = None
+        self.run_active = False  # Between open_run_state and close_run_state
+        self.keep_run_state = False  # Watch mode keeps journal and manifest open between runs
+        self.failed_items = []
+        self.failed_lock = threading.Lock()
+        self.retry_workers = 4
+        self.feed_key = None
+        self.feed_limit = 15  # Redmine default "Feed content limit"
+        self.max_workers = 4
+        self.engine = "threads"  # Or "asyncio", see download_project
+        self.process_workers = 0  # Process pool for parsing and rendering pages, 0 = download threads do it
+        self.process_batch = 8
+        self.page_processor = None
+        self.io_executor = None  # Thread pool for blocking file work of the asyncio engine
+        self.rate_limiter = RateLimiter()
+        self.progress = ProgressTracker()
+        self.manifest = None
+        self.shard = None  # {'index': i, 'count': n} when this run is one shard of a larger backup
+        self.run_projects = []
+        self.log_lock = threading.Lock()
+        self.profiler = PhaseProfiler()
+        self.unprofiled_workers = None  # Worker settings replaced by enable_profiling
+
     def setup_main_window(self):
         """Setup main window"""
         # Title
@@ -113,6 +1525,13 @@ class RedmineWikiDownloader:
         tk.Radiobutton(mode_radio_frame, text="Project", variable=self.download_mode, value="project").pack(side="left")
         tk.Radiobutton(mode_radio_frame, text="All", variable=self.download_mode, value="all").pack(side="left", padx=(10, 0))
 
+        # Resume option
+        resume_frame = tk.Frame(input_frame)
+        resume_frame.pack(fill="x", pady=5)
+        tk.Label(resume_frame, text="Options:", width=15, anchor="w").pack(side="left")
+        tk.Checkbutton(resume_frame, text="Resume previous run", variable=self.resume_run).pack(side="left")
+        tk.Checkbutton(resume_frame, text="Profile run", variable=self.profile_run).pack(side="left", padx=(10, 0))
+
         # Authentication method selection
         auth_mode_frame = tk.Frame(input_frame)
         auth_mode_frame.pack(fill="x", pady=5)
@@ -212,6 +1631,11 @@ class RedmineWikiDownloader:
         if not self.validate_inputs():
             return
 
+        if self.profile_run.get():
+            self.enable_profiling(os.path.join(self.save_path.get(), "profile"))
+        else:
+            self.disable_profiling()
+
         try:
             # Test API connection and fetch project list
             self.projects_data = self.fetch_projects()
@@ -222,8 +1646,39 @@ class RedmineWikiDownloader:
                 self.show_project_selection()
 
         except Exception as e:
+            self.disable_profiling()
             messagebox.showerror("Error", f"API connection failed: {str(e)}")
 
+    @profiled("fetch")
+    def http_get(self, url: str, **kwargs):
+        """GET request that respects the shared limits and is aborted when the run is cancelled
+
+        Raises DownloadCancelled instead of the connection error caused by cancelling.
+        Streamed bodies are read after this returns, callers wrap them in
+        cancel_token.tracking() to keep the connection abortable.
+        """
+        cancel = self.cancel_token
+        self.rate_limiter.acquire_request(cancel)
+        try:
+            with cancel.tracking(), cancellable_session() as session:
+                response = session.get(url, **kwargs)
+        except DownloadCancelled:
+            raise
+        except Exception as e:
+            if cancel.cancelled:
+                raise DownloadCancelled() from e
+            raise
+
+        if not kwargs.get('stream'):
+            # Streamed bodies are limited chunk by chunk by the caller
+            self.rate_limiter.acquire_bytes(len(response.content), cancel)
+        return response
+
+    @profiled("parse")
+    def parse_xml(self, content: bytes):
+        import xml.etree.ElementTree as ET
+        return ET.fromstring(content)
+
     def get_auth_params(self):
         """Return parameters and authentication headers based on authentication method"""
         if self.auth_mode.get() == "api_key":
@@ -231,6 +1686,7 @@ class RedmineWikiDownloader:
         else:
             return {}, (self.username.get(), self.password.get())
 
+    @profiled("listing")
     def fetch_projects(self) -> List[Dict]:
         """Fetch all projects using pagination"""
         params, auth = self.get_auth_params()
@@ -244,10 +1700,10 @@ class RedmineWikiDownloader:
             params["limit"] = limit
             params["offset"] = offset
 
-            response = requests.get(url, params=params, auth=auth)
+            response = self.http_get(url, params=params, auth=auth)
             response.raise_for_status()
 
-            root = ET.fromstring(response.content)
+            root = self.parse_xml(response.content)
 
             # Get pagination info
             total_count = int(root.get('total_count', 0))
@@ -341,46 +1797,351 @@ class RedmineWikiDownloader:
     def start_download_thread(self, projects_to_download):
         """Execute download in separate thread"""
         self.is_downloading = True
-        self.cancel_download = False
+        self.cancel_token = CancelToken()
 
         def download_worker():
             try:
-                total_projects = len(projects_to_download)
-                self.add_log(f"Download started - Total {total_projects} projects")
-
-                for i, project in enumerate(projects_to_download):
-                    if self.cancel_download:
-                        self.add_log("Download cancelled by user.")
-                        break
-
-                    self.current_status.set(f"Downloading project '{project['name']}'...")
-                    self.progress_var.set((i / total_projects) * 100)
-                    self.add_log(f"Starting project '{project['name']}'...")
-                    self.root.update_idletasks()
-
-                    self.download_project_wiki_threaded(project)
-
-                if not self.cancel_download:
-                    self.current_status.set("Download completed!")
-                    self.progress_var.set(100)
-                    self.add_log("All downloads completed!")
-                    self.root.update_idletasks()
-                    time.sleep(1)
-                    self.root.after(0, self.show_completion_screen)
-                else:
-                    self.current_status.set("Download cancelled.")
-                    self.root.update_idletasks()
-                    time.sleep(2)
-                    self.root.after(0, self.show_main_window)
-
+                completed = self.run_download(projects_to_download)
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", f"Error occurred during download: {str(e)}"))
+                # e is unbound once the except block ends, bind the message for the Tk callback
+                message = f"Error occurred during download: {str(e)}"
+                self.root.after(0, lambda: messagebox.showerror("Error", message))
                 self.root.after(0, self.show_main_window)
+                return
             finally:
+                self.write_profile_report()
+                # Workers have stopped and files are complete, closing the window is safe from here
                 self.is_downloading = False
 
+            if completed:
+                self.current_status.set("Download completed!")
+                self.progress_var.set(100)
+                self.add_log("All downloads completed!")
+                self.refresh_ui()
+                time.sleep(1)
+                self.root.after(0, self.show_completion_screen)
+            else:
+                self.current_status.set("Download cancelled.")
+                self.refresh_ui()
+                time.sleep(2)
+                self.root.after(0, self.show_main_window)
+
         thread = threading.Thread(target=download_worker, daemon=True)
         thread.start()
+        self.root.after(500, self.update_progress_meter)
+
+    def select_engine(self, engine: str):
+        """Use the given download engine, the asyncio engine needs a direct connection"""
+        if engine == "asyncio":
+            from urllib.request import getproxies
+
+            if {'http', 'https'} & set(getproxies()):
+                self.add_log("A proxy is configured and the asyncio engine connects directly - using threads")
+                engine = "threads"
+        self.engine = engine
+
+    def enable_profiling(self, output_dir: str):
+        """Profile the download phases in a single worker thread so phases are attributed correctly"""
+        # Import lazily loaded modules before tracing starts so their import is not counted as a phase
+        import requests  # noqa: F401
+        import xml.etree.ElementTree  # noqa: F401
+        from concurrent.futures import ThreadPoolExecutor  # noqa: F401
+
+        self.profiler.stop()
+        self.profiler = PhaseProfiler(output_dir)
+        if self.unprofiled_workers is None:
+            self.unprofiled_workers = (self.max_workers, self.retry_workers, self.process_workers)
+        self.max_workers = 1
+        self.retry_workers = 1
+        self.process_workers = 0
+
+    def disable_profiling(self):
+        """Stop profiling and restore the worker settings replaced by enable_profiling"""
+        self.profiler.stop()
+        self.profiler = PhaseProfiler()
+        if self.unprofiled_workers is not None:
+            self.max_workers, self.retry_workers, self.process_workers = self.unprofiled_workers
+            self.unprofiled_workers = None
+
+    def write_profile_report(self):
+        report_path = self.profiler.write_report()
+        if report_path:
+            self.add_log(f"Profile report written to '{report_path}'")
+
+    def update_progress_meter(self):
+        """Refresh progress bar and throughput meter from the main thread"""
+        if not self.is_downloading:
+            return
+
+        stats = self.progress.snapshot()
+        self.progress_var.set(stats['fraction'] * 100)
+        self.throughput_text.set(format_throughput(stats))
+        self.root.after(500, self.update_progress_meter)
+
+    def run_download(self, projects_to_download: List[Dict]) -> bool:
+        """Download the given projects, returns False if cancelled"""
+        total_projects = len(projects_to_download)
+        self.add_log(f"Download started - Total {total_projects} projects")
+        self.run_projects = [project['identifier'] for project in projects_to_download]
+
+        self.open_run_state(resume=self.resume_run.get())
+        if self.resume_run.get():
+            self.add_log(f"Resuming previous run - {len(self.journal.completed)} items already completed, "
+                         f"{len(self.journal.failed)} failed items will be retried")
+
+        try:
+            # List every wiki first so progress is measured against the planned work
+            planned_projects = []
+            for project in projects_to_download:
+                if self.cancel_token.cancelled:
+                    break
+
+                if self.journal.is_done("project", project['identifier']):
+                    self.add_log(f"Skipping project '{project['name']}' (already completed)")
+                    continue
+
+                self.current_status.set(f"Listing wiki pages of project '{project['name']}'...")
+                self.add_log(f"Fetching wiki list for project '{project['name']}'...")
+                self.refresh_ui()
+
+                wiki_pages = self.fetch_wiki_pages_threaded(project['identifier'])
+                self.progress.plan_pages(sum(1 for page_title in wiki_pages
+                                             if not self.journal.is_done("page", project['identifier'], page_title)))
+                planned_projects.append((project, wiki_pages))
+
+            for project, wiki_pages in planned_projects:
+                if self.cancel_token.cancelled:
+                    self.add_log("Download cancelled by user.")
+                    break
+
+                self.current_status.set(f"Downloading project '{project['name']}'...")
+                self.add_log(f"Starting project '{project['name']}'...")
+                self.refresh_ui()
+
+                self.download_project(project, wiki_pages)
+
+            self.finish_failed_items()
+            return not self.cancel_token.cancelled
+        finally:
+            self.close_run_state()
+            self.write_run_metrics()
+
+    def download_changed_pages(self, changes: List[tuple]) -> bool:
+        """Download only the given (project identifier, page title) pairs, returns False if cancelled"""
+        projects_by_id = {project['identifier']: project for project in self.projects_data}
+        self.add_log(f"Downloading {len(changes)} changed wiki pages")
+
+        self.open_run_state(resume=True)
+        self.progress.plan_pages(len(changes))
+        try:
+            for identifier, title in changes:
+                if self.cancel_token.cancelled:
+                    self.add_log("Download cancelled by user.")
+                    break
+
+                project = projects_by_id.get(identifier)
+                if project is None:
+                    self.add_log(f"Skipping '{title}' - unknown project '{identifier}'")
+                    continue
+
+                project_dir = os.path.join(self.save_path.get(), self.sanitize_filename(project['name']))
+                os.makedirs(project_dir, exist_ok=True)
+
+                self.add_log(f"Downloading: {project['name']} / {title}")
+                try:
+                    success = self.download_wiki_page_threaded(identifier, title, project_dir)
+                except DownloadCancelled:
+                    self.add_log("Download cancelled by user.")
+                    break
+                self.progress.page_done()
+                if success:
+                    self.add_log(f"Completed: {title}")
+                else:
+                    self.add_log(f"Failed: {title}")
+
+            self.finish_failed_items()
+            return not self.cancel_token.cancelled
+        finally:
+            self.close_run_state()
+
+    def finish_failed_items(self):
+        """Give transient failures a second chance, then write what is left"""
+        if not self.cancel_token.cancelled:
+            retryable = [item for item in self.failed_items if self.is_retryable(item)]
+            if retryable:
+                self.failed_items = [item for item in self.failed_items if not self.is_retryable(item)]
+                self.retry_failed_items(retryable)
+
+        self.write_failed_items()
+
+    def run_failed_items(self, failed_file: str) -> bool:
+        """Re-fetch only the items listed in a failed items file, returns False if cancelled"""
+        with open(failed_file, 'r', encoding='utf-8') as f:
+            items = json.load(f)['items']
+
+        self.add_log(f"Retrying {len(items)} failed items from '{failed_file}'")
+
+        self.open_run_state(resume=True)
+        self.progress.plan_pages(sum(1 for item in items if item['type'] == "page"))
+        try:
+            self.retry_failed_items(items)
+            self.write_failed_items()
+            return not self.cancel_token.cancelled
+        finally:
+            self.close_run_state()
+
+    def open_run_state(self, resume: bool):
+        """Open journal, content manifest and progress tracking for a run"""
+        self.failed_items = []
+        if self.keep_run_state and self.journal is not None:
+            # Loaded by an earlier run of this watch, not read from disk again
+            if not resume:
+                self.journal.truncate()
+            self.manifest.reset_counts()
+        else:
+            self.journal = RunJournal(self.save_path.get(), resume=resume)
+            self.manifest = ContentManifest(self.save_path.get())
+        self.progress = ProgressTracker()
+        if self.process_workers > 0:
+            self.page_processor = PageProcessor(self.process_workers, self.process_batch)
+        self.run_active = True
+
+    def close_run_state(self):
+        self.run_active = False
+        if self.cancel_token.cancelled:
+            self.cancel_to_idle = round(self.cancel_token.elapsed(), 3)
+            self.add_log(f"All workers stopped {self.cancel_to_idle:.2f} s after cancel")
+        if self.page_processor is not None:
+            self.page_processor.close()
+            self.page_processor = None
+        if not self.keep_run_state:
+            self.journal.close()
+        self.manifest.save()
+        self.add_log(f"Files written: {self.manifest.written_files} ({self.manifest.written_bytes / 1024 ** 2:.2f} MB), "
+                     f"skipped unchanged: {self.manifest.skipped_files} "
+                     f"({self.manifest.skipped_bytes / 1024 ** 2:.2f} MB)")
+
+    def write_run_metrics(self):
+        """Write metrics of a full download run next to the manifest"""
+        stats = self.progress.snapshot()
+        metrics = {
+            'shard': self.shard,
+            'finished': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'cancelled': self.cancel_token.cancelled,
+            'cancel_to_idle_seconds': self.cancel_to_idle,
+            'projects': self.run_projects,
+            'pages_done': stats['pages_done'],
+            'pages_planned': stats['pages_planned'],
+            'bytes_received': stats['bytes_received'],
+            'elapsed_seconds': round(stats['elapsed_seconds'], 3),
+            'files_written': self.manifest.written_files,
+            'bytes_written': self.manifest.written_bytes,
+            'files_skipped': self.manifest.skipped_files,
+            'bytes_skipped': self.manifest.skipped_bytes,
+            'failed_items': len(self.failed_items)
+        }
+        with open(os.path.join(self.save_path.get(), RUN_METRICS_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump(metrics, f, ensure_ascii=False, indent=2)
+
+    def retry_failed_items(self, items: List[Dict]):
+        """Process the retry queue concurrently, items that fail again are re-queued"""
+        self.add_log(f"Retrying {len(items)} failed items with {self.retry_workers} workers...")
+        self.current_status.set(f"Retrying {len(items)} failed items...")
+        self.refresh_ui()
+
+        results = self.run_in_workers(self.retry_failed_item, [(item,) for item in items], self.retry_workers)
+
+        # Pages whose only failures were attachments are complete once none of them is failing anymore
+        # (a retried page records itself)
+        retried_pages = {(item['project'], item['page']) for item in items if item['type'] == "page"}
+        still_failing = {(item['project'], item['page']) for item in self.failed_items}
+        for project, page in {(item['project'], item['page']) for item in items if item['type'] == "attachment"}:
+            if (project, page) not in still_failing | retried_pages:
+                self.journal.record("page", project, page)
+
+        self.add_log(f"Retry finished - {results.count(True)} recovered, {results.count(False)} still failing")
+
+    def run_in_workers(self, function, argument_tuples: List[tuple], workers: int) -> List:
+        """Call function for each argument tuple in a thread pool and return the results in order
+
+        If waiting is interrupted (Ctrl+C) or a call raises, the run is cancelled
+        and this only returns once every worker has stopped.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(function, *arguments) for arguments in argument_tuples]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                self.cancel_token.cancel()
+                raise
+
+    def retry_failed_item(self, item: Dict) -> bool:
+        """Retry a single page or attachment from the retry queue"""
+        if self.cancel_token.cancelled:
+            self.failed_items_append(item)
+            return False
+
+        try:
+            if item['type'] == "attachment":
+                os.makedirs(os.path.dirname(item['save_path']), exist_ok=True)
+                success = self.download_attachment(item['content_url'], item['save_path'], item)
+                if success:
+                    self.journal.record("attachment", item['project'], item['page'], item['attachment'])
+            else:
+                os.makedirs(item['save_dir'], exist_ok=True)
+                success = self.download_wiki_page_threaded(item['project'], item['page'], item['save_dir'])
+                self.progress.page_done()
+        except DownloadCancelled:
+            self.failed_items_append(item)  # Not retried yet, keep it for the next --retry-failed
+            return False
+
+        self.add_log(f"{'Recovered' if success else 'Still failing'}: {item.get('filename') or item['page']}")
+        return success
+
+    def record_failure(self, item: Dict, error: Exception):
+        """Add a failed page or attachment to the retry queue with reason and HTTP status"""
+        response = getattr(error, 'response', None)
+        failed_item = dict(item)
+        failed_item['reason'] = self.redact(str(error))  # Keep API key out of the failed items file
+        failed_item['status'] = response.status_code if response is not None else None
+        self.failed_items_append(failed_item)
+
+    def redact(self, text: str) -> str:
+        """Hide API and feed keys in error messages, which include the request URL"""
+        text = re.sub(r'([?&]key=)[^&\s]+', r'\1***', text)
+        for secret in (self.api_key.get(), self.feed_key):
+            if secret:
+                text = text.replace(secret, "***")
+        return text
+
+    def failed_items_append(self, item: Dict):
+        with self.failed_lock:
+            self.failed_items.append(item)
+
+    @staticmethod
+    def is_retryable(item: Dict) -> bool:
+        """Connection errors, timeouts and server errors are worth retrying"""
+        status = item.get('status')
+        return status is None or status >= 500 or status in (408, 429)
+
+    def write_failed_items(self):
+        """Write the final list of failed items next to the downloaded wiki"""
+        failed_file = os.path.join(self.save_path.get(), self.FAILED_ITEMS_FILENAME)
+        if not self.failed_items:
+            if os.path.exists(failed_file):
+                os.remove(failed_file)
+            return
+
+        with open(failed_file, 'w', encoding='utf-8') as f:
+            json.dump({"redmine_url": self.redmine_url.get(), "items": self.failed_items},
+                      f, ensure_ascii=False, indent=2)
+
+        failed_pages = sum(1 for item in self.failed_items if item['type'] == "page")
+        failed_attachments = len(self.failed_items) - failed_pages
+        self.add_log(f"{failed_pages} pages and {failed_attachments} attachments failed - "
+                     f"list saved to '{failed_file}'")
 
     def show_progress_screen(self):
         """Show download progress screen"""
@@ -423,7 +2184,11 @@ class RedmineWikiDownloader:
             length=400,
             mode='determinate'
         )
-        progress_bar.pack(pady=20)
+        progress_bar.pack(pady=(20, 5))
+
+        # Live throughput and ETA
+        throughput_label = tk.Label(progress_frame, textvariable=self.throughput_text, font=("Arial", 9))
+        throughput_label.pack(pady=(0, 10))
 
         # Progress log text area (fixed size)
         log_frame = tk.Frame(progress_frame)
@@ -457,19 +2222,39 @@ class RedmineWikiDownloader:
     def on_cancel_download(self):
         """Confirm download cancellation"""
         if messagebox.askyesno("Confirm", "Do you want to stop the task?"):
-            self.cancel_download = True
+            self.cancel_token.cancel()
+            self.current_status.set("Stopping downloads...")
 
     def on_window_close(self):
         """Handle window close event"""
         if self.is_downloading:
             if messagebox.askyesno("Confirm", "Download is in progress. Do you want to stop the task and exit the program?"):
-                self.cancel_download = True
-                self.root.quit()
+                self.cancel_token.cancel()
+                self.current_status.set("Stopping downloads...")
+                self.quit_when_idle(time.monotonic() + self.CLOSE_TIMEOUT)
         else:
             self.root.quit()
 
-    def download_project_wiki_threaded(self, project: Dict):
-        """Project wiki download executed in thread"""
+    def quit_when_idle(self, deadline: float):
+        """Quit once the workers have stopped, so no file is left half-written"""
+        if self.is_downloading and time.monotonic() < deadline:
+            self.root.after(100, self.quit_when_idle, deadline)
+        else:
+            self.root.quit()
+
+    def download_project(self, project: Dict, wiki_pages: Optional[List[str]] = None):
+        """Download a project's wiki pages with the selected engine"""
+        if self.engine == "asyncio":
+            self.download_project_wiki_async(project, wiki_pages)
+        else:
+            self.download_project_wiki_threaded(project, wiki_pages)
+
+    def prepare_project(self, project: Dict, wiki_pages: Optional[List[str]]) -> tuple:
+        """Create the project folder and list its wiki pages unless already listed
+
+        Returns (project_dir, wiki_pages, pending) where pending holds the
+        (index, title) pairs not yet completed according to the journal.
+        """
         identifier = project['identifier']
         project_name = project['name']
 
@@ -480,37 +2265,232 @@ class RedmineWikiDownloader:
         os.makedirs(project_dir, exist_ok=True)
 
         # Fetch wiki page list
-        self.add_log(f"Fetching wiki list for project '{project_name}'...")
-        wiki_pages = self.fetch_wiki_pages_threaded(identifier)
+        if wiki_pages is None:
+            self.add_log(f"Fetching wiki list for project '{project_name}'...")
+            wiki_pages = self.fetch_wiki_pages_threaded(identifier)
 
         if not wiki_pages:
             self.add_log(f"No wiki pages found in project '{project_name}'.")
-            return
+            return project_dir, [], []
 
         self.add_log(f"Found {len(wiki_pages)} wiki pages in project '{project_name}'")
+        pending = [(i, page_title) for i, page_title in enumerate(wiki_pages)
+                   if not self.journal.is_done("page", identifier, page_title)]
+        return project_dir, wiki_pages, pending
+
+    def log_page_started(self, project_name: str, page_title: str, i: int, total: int):
+        # Display abbreviated text
+        truncated_project = self.truncate_text(project_name, 20)
+        truncated_page = self.truncate_text(page_title, 30)
+        self.current_status.set(f"Project '{truncated_project}' - Downloading page '{truncated_page}'... ({i+1}/{total})")
+
+        # Add detailed information to log
+        self.add_log(f"Downloading: {page_title} ({i+1}/{total})")
+        self.refresh_ui()
+
+    def log_page_finished(self, page_title: str, success: bool):
+        self.progress.page_done()
+        if success:
+            self.add_log(f"Completed: {page_title}")
+        else:
+            self.add_log(f"Failed: {page_title}")
 
-        # Download each wiki page
-        for i, page_title in enumerate(wiki_pages):
-            if self.cancel_download:
-                break
+    def finish_project(self, project: Dict):
+        # Only mark the project complete when nothing is left to retry
+        with self.failed_lock:
+            has_failures = any(item.get('project') == project['identifier'] for item in self.failed_items)
+        if not self.cancel_token.cancelled and not has_failures:
+            self.journal.record("project", project['identifier'])
+
+        self.add_log(f"Project '{project['name']}' download completed")
+
+    def download_project_wiki_threaded(self, project: Dict, wiki_pages: Optional[List[str]] = None):
+        """Project wiki download executed in thread, wiki_pages is fetched if not already listed"""
+        project_dir, wiki_pages, pending = self.prepare_project(project, wiki_pages)
+        if not wiki_pages:
+            return
+
+        def download_page(i: int, page_title: str):
+            if self.cancel_token.cancelled:
+                return
 
-            # Display abbreviated text
-            truncated_project = self.truncate_text(project_name, 20)
-            truncated_page = self.truncate_text(page_title, 30)
-            self.current_status.set(f"Project '{truncated_project}' - Downloading page '{truncated_page}'... ({i+1}/{len(wiki_pages)})")
+            self.log_page_started(project['name'], page_title, i, len(wiki_pages))
+            try:
+                success = self.download_wiki_page_threaded(project['identifier'], page_title, project_dir)
+            except DownloadCancelled:
+                return  # Stays pending in the journal
+            self.log_page_finished(page_title, success)
+
+        # Download wiki pages concurrently, the shared rate limiter bounds the total load
+        self.run_in_workers(download_page, pending, self.max_workers)
+        self.finish_project(project)
+
+    def download_project_wiki_async(self, project: Dict, wiki_pages: Optional[List[str]] = None):
+        """Same as download_project_wiki_threaded, with all page downloads on one asyncio event loop
+
+        max_workers pages are in flight at once without a thread for each, so
+        thousands of concurrent requests are possible.
+        """
+        import asyncio
+
+        project_dir, wiki_pages, pending = self.prepare_project(project, wiki_pages)
+        if not wiki_pages:
+            return
+
+        interrupted = []
+        try:
+            asyncio.run(self.download_pages_async(project, project_dir, len(wiki_pages), pending, interrupted))
+        except asyncio.CancelledError:
+            if not self.cancel_token.cancelled:
+                raise
+        except KeyboardInterrupt:
+            self.cancel_token.cancel()
+            raise
+        if interrupted:
+            raise KeyboardInterrupt  # Ctrl+C was handled on the loop, report it like the threaded engine
+
+        self.finish_project(project)
+
+    async def download_pages_async(self, project: Dict, project_dir: str, total: int, pending: List[tuple],
+                                   interrupted: List):
+        import asyncio
+        import signal
+        from concurrent.futures import ThreadPoolExecutor
+
+        loop = asyncio.get_running_loop()
+        main_task = asyncio.current_task()
+        client = AsyncHttpClient()
+        pages = iter(pending)  # Shared by the workers, safe as they all run on this thread
+        # File writes, journal fsyncs, hashing and in-process page conversion run here
+        # so they do not stall the sockets of the other pages
+        self.io_executor = ThreadPoolExecutor(max_workers=min(self.max_workers, 32))
+
+        def on_cancel():
+            try:
+                loop.call_soon_threadsafe(main_task.cancel)
+            except RuntimeError:
+                pass  # Loop already finished
 
-            # Add detailed information to log
-            self.add_log(f"Downloading: {page_title} ({i+1}/{len(wiki_pages)})")
-            self.root.update_idletasks()
+        def on_interrupt():
+            # Cancel the run at the signal, not after asyncio has unwound the task
+            interrupted.append(True)
+            self.cancel_token.cancel()
 
-            success = self.download_wiki_page_threaded(identifier, page_title, project_dir)
-            if success:
-                self.add_log(f"Completed: {page_title}")
+        try:
+            loop.add_signal_handler(signal.SIGINT, on_interrupt)
+            sigint_handled = True
+        except (NotImplementedError, RuntimeError, ValueError):
+            sigint_handled = False  # Windows or not the main thread (GUI), which cancels through the token
+
+        async def worker():
+            for i, page_title in pages:
+                if self.cancel_token.cancelled:
+                    return
+                self.log_page_started(project['name'], page_title, i, total)
+                success = await self.download_wiki_page_async(client, project['identifier'], page_title, project_dir)
+                self.log_page_finished(page_title, success)
+
+        self.cancel_token.add_callback(on_cancel)
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.max_workers, len(pending)))))
+        finally:
+            self.cancel_token.remove_callback(on_cancel)
+            if sigint_handled:
+                loop.remove_signal_handler(signal.SIGINT)
+            client.close()
+            # Let file work that is already running finish before the journal is closed
+            self.io_executor.shutdown(wait=True)
+            self.io_executor = None
+
+    async def in_thread(self, function, *args):
+        """Run blocking file or CPU work of the asyncio engine on io_executor"""
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(self.io_executor, function, *args)
+
+    async def async_get(self, client: AsyncHttpClient, url: str, **kwargs) -> AsyncResponse:
+        """http_get for the asyncio engine"""
+        import asyncio
+
+        await asyncio.sleep(self.rate_limiter.reserve_request())
+        with self.profiler.phase("fetch"):
+            response = await client.get(url, **kwargs)
+        if not kwargs.get('stream'):
+            await asyncio.sleep(self.rate_limiter.reserve_bytes(len(response.content)))
+        return response
+
+    async def download_wiki_page_async(self, client: AsyncHttpClient, identifier: str, title: str,
+                                       save_dir: str) -> bool:
+        """download_wiki_page_threaded for the asyncio engine"""
+        import asyncio
+
+        try:
+            url, params, auth = self.page_request(identifier, title)
+            response = await self.async_get(client, url, params=params, auth=auth)
+            response.raise_for_status()
+
+            self.progress.add_page_bytes(len(response.content))
+
+            if self.page_processor is not None:
+                page = await asyncio.wrap_future(self.page_processor.submit(response.content, save_dir))
             else:
-                self.add_log(f"Failed: {page_title}")
+                page = await self.in_thread(process_page, response.content, self.profiler.phase)
+            pending_attachments = await self.in_thread(self.store_page, identifier, title, save_dir, page)
+
+            # Download attachments to the same folder
+            all_attachments_saved = True
+            for attachment, att_filepath in pending_attachments:
+                self.add_log(f"  Downloading attachment: {attachment['filename']}")
+                item = self.attachment_item(identifier, title, attachment, att_filepath)
+                if await self.download_attachment_async(client, attachment['content_url'], att_filepath, item):
+                    await self.in_thread(self.journal.record, "attachment", identifier, title, attachment['id'])
+                else:
+                    all_attachments_saved = False
+
+            # The page stays pending in the journal until its attachments are saved
+            if all_attachments_saved:
+                await self.in_thread(self.journal.record, "page", identifier, title)
+
+            return True
+
+        except asyncio.CancelledError:
+            raise  # Not a failure, the page stays pending in the journal
+        except Exception as e:
+            await self.in_thread(self.page_failed, identifier, title, save_dir, e)
+            return False
+
+    async def download_attachment_async(self, client: AsyncHttpClient, content_url: str, save_path: str,
+                                        item: Dict) -> bool:
+        """download_attachment for the asyncio engine"""
+        import asyncio
 
-        self.add_log(f"Project '{project_name}' download completed")
+        try:
+            params, auth = self.get_auth_params()
+            response = await self.async_get(client, content_url, params=params, auth=auth, stream=True)
+            try:
+                response.raise_for_status()
+
+                # The .part file is removed if the transfer is cancelled or fails
+                with self.profiler.phase("write"), PartFile(save_path) as part:
+                    async for chunk in response.iter_content(64 * 1024):
+                        await asyncio.sleep(self.rate_limiter.reserve_bytes(len(chunk)))
+                        self.progress.add_attachment_bytes(len(chunk))
+                        await self.in_thread(part.write, chunk)
+                # Hashes the existing file to detect unchanged content
+                await self.in_thread(self.manifest.commit_part, part, item)
+            finally:
+                response.close()
 
+            return True
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.add_log(self.redact(f"Failed to download attachment from '{content_url}': {e}"))
+            self.record_failure(item, e)
+            return False
+
+    @profiled("listing")
     def fetch_wiki_pages_threaded(self, identifier: str) -> List[str]:
         """Fetch all wiki pages using pagination executed in thread"""
         params, auth = self.get_auth_params()
@@ -525,13 +2505,13 @@ class RedmineWikiDownloader:
                 params["limit"] = limit
                 params["offset"] = offset
 
-                response = requests.get(url, params=params, auth=auth)
+                response = self.http_get(url, params=params, auth=auth)
                 if response.status_code == 404:
                     return []  # Project without wiki
 
                 response.raise_for_status()
 
-                root = ET.fromstring(response.content)
+                root = self.parse_xml(response.content)
 
                 # Get pagination info
                 total_count = int(root.get('total_count', 0))
@@ -553,141 +2533,208 @@ class RedmineWikiDownloader:
                 offset += limit
 
             return all_pages
+        except DownloadCancelled:
+            return []
         except Exception as e:
-            print(f"Failed to fetch wiki page list: {e}")
+            self.add_log(self.redact(f"Failed to fetch wiki page list: {e}"))
             return []
 
-    def fetch_attachments(self, identifier: str, wiki_title: str) -> List[Dict]:
-        """Fetch attachments for a wiki page"""
-        try:
-            params, auth = self.get_auth_params()
-            encoded_title = quote(wiki_title, safe='')
-            url = f"{self.redmine_url.get()}/projects/{identifier}/wiki/{encoded_title}.xml"
+    @profiled("listing")
+    def fetch_wiki_activity(self, cursor: Optional[Dict]) -> tuple:
+        """Read wiki edits newer than cursor from the activity Atom feed
 
-            # Include attachments in the request
-            params['include'] = 'attachments'
+        Returns (changes, new_cursor, complete) where changes is a list of
+        (project identifier, page title) pairs, oldest first. complete is False
+        when the feed is full and no longer reaches back to the cursor, meaning
+        edits may have been pushed out of the feed and a full sync is needed.
+        """
+        # Atom feeds authenticate only with the Atom access key, not the API key or basic auth
+        params = {"key": self.feed_key, "show_wiki_edits": 1}
+        url = f"{self.redmine_url.get()}/activity.atom"
 
-            response = requests.get(url, params=params, auth=auth)
-            response.raise_for_status()
+        response = self.http_get(url, params=params)
+        response.raise_for_status()
 
-            root = ET.fromstring(response.content)
-            attachments = []
+        root = self.parse_xml(response.content)
+        feed_entries = root.findall(f'{{{ATOM_NS}}}entry')
+        feed_full = len(feed_entries) >= self.feed_limit
+
+        entries = []
+        for entry in feed_entries:
+            link = entry.find(f'{{{ATOM_NS}}}link')
+            match = re.search(r'/projects/([^/]+)/wiki/([^/?#]+)', link.get('href', '') if link is not None else '')
+            if not match:
+                continue
+
+            entries.append({
+                'id': entry.findtext(f'{{{ATOM_NS}}}id'),
+                'updated': entry.findtext(f'{{{ATOM_NS}}}updated'),
+                'project': unquote(match.group(1)),
+                'page': unquote(match.group(2))
+            })
+
+        # Feed is newest first. Timestamps are compared as datetimes since their
+        # UTC offset changes with daylight saving time
+        for entry in entries:
+            entry['time'] = parse_feed_time(entry['updated'])
+        entries.sort(key=lambda e: e['time'])
+        if entries:
+            newest = entries[-1]['time']
+            new_cursor = {'updated': entries[-1]['updated'],
+                          'seen': [e['id'] for e in entries if e['time'] == newest]}
+        elif cursor:
+            new_cursor = {'updated': cursor['updated'], 'seen': cursor['seen']}
+        else:
+            new_cursor = {'updated': "", 'seen': []}
 
-            for attachment in root.findall('.//attachment'):
-                att_id = attachment.find('id').text
-                filename = attachment.find('filename').text
-                content_url = attachment.find('content_url').text
+        if cursor is None:
+            return [], new_cursor, True
 
-                attachments.append({
-                    'id': att_id,
-                    'filename': filename,
-                    'content_url': content_url
-                })
+        cursor_time = parse_feed_time(cursor['updated'])
+        new_entries = [e for e in entries
+                       if e['time'] > cursor_time or (e['time'] == cursor_time and e['id'] not in cursor['seen'])]
+        complete = len(new_entries) < len(entries) or not feed_full
 
-            return attachments
+        changes = []
+        for entry in new_entries:
+            change = (entry['project'], entry['page'])
+            if change not in changes:
+                changes.append(change)
 
-        except Exception as e:
-            print(f"Failed to fetch attachments for wiki page '{wiki_title}': {e}")
-            return []
+        return changes, new_cursor, complete
 
-    def download_attachment(self, content_url: str, save_path: str) -> bool:
-        """Download a single attachment file"""
+    def download_attachment(self, content_url: str, save_path: str, item: Optional[Dict] = None) -> bool:
+        """Download a single attachment file, failures are added to the retry queue as item"""
+        cancel = self.cancel_token
         try:
             params, auth = self.get_auth_params()
 
-            response = requests.get(content_url, params=params, auth=auth, stream=True)
-            response.raise_for_status()
+            # Tracking covers the body too, cancelling shuts the socket down mid-transfer
+            with cancel.tracking():
+                response = self.http_get(content_url, params=params, auth=auth, stream=True)
+                with response:
+                    response.raise_for_status()
+
+                    def chunks():
+                        for chunk in response.iter_content(chunk_size=8192):
+                            cancel.raise_if_cancelled()
+                            self.rate_limiter.acquire_bytes(len(chunk), cancel)
+                            self.progress.add_attachment_bytes(len(chunk))
+                            yield chunk
 
-            with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+                    # The .part file is removed if the transfer is cancelled or fails
+                    with self.profiler.phase("write"):
+                        self.manifest.write_stream(save_path, chunks(), item)
 
             return True
 
+        except DownloadCancelled:
+            raise
         except Exception as e:
-            print(f"Failed to download attachment from '{content_url}': {e}")
+            if cancel.cancelled:
+                raise DownloadCancelled() from e
+            self.add_log(self.redact(f"Failed to download attachment from '{content_url}': {e}"))
+            self.record_failure(item or {'type': "attachment", 'content_url': content_url, 'save_path': save_path}, e)
             return False
 
-    def convert_image_links(self, text: str, attachments: List[Dict]) -> str:
-        """Convert Redmine image links to local markdown format"""
-        if not text or not attachments:
-            return text
-
-        # Create a mapping of attachment filenames
-        att_filenames = {att['filename']: att['filename'] for att in attachments}
-
-        # Pattern to match Redmine image syntax: !filename.ext! or !>filename.ext!
-        import re
-
-        def replace_image(match):
-            align = match.group(1) or ''  # Capture alignment (>, <, =)
-            filename = match.group(2)
-
-            # Check if this filename exists in attachments
-            if filename in att_filenames:
-                # Convert to markdown image syntax with relative path
-                return f"![{filename}](./{filename})"
-            return match.group(0)  # Return original if not found
+    def process_page_payload(self, page_xml: bytes, save_dir: str) -> Dict:
+        """Parse and render a fetched page in the process pool if enabled, otherwise in this thread"""
+        if self.page_processor is not None:
+            return self.page_processor.submit(page_xml, save_dir).result()
+        return process_page(page_xml, self.profiler.phase)
 
-        # Replace Redmine image syntax with markdown
-        text = re.sub(r'!([><\-=])?([^!\s]+)!', replace_image, text)
-
-        return text
+    def page_request(self, identifier: str, title: str) -> tuple:
+        """(url, params, auth) of a wiki page request, one request returns the text and the attachment list"""
+        params, auth = self.get_auth_params()
+        encoded_title = quote(title, safe='')
+        url = f"{self.redmine_url.get()}/projects/{identifier}/wiki/{encoded_title}.xml"
+        params['include'] = 'attachments'
+        return url, params, auth
+
+    def store_page(self, identifier: str, title: str, save_dir: str, page: Dict) -> List[tuple]:
+        """Write a processed page, returns the (attachment, path) pairs that still need downloading"""
+        # Pages with attachments are saved in a folder with the wiki page name
+        filepath = page_path(save_dir, page)
+        wiki_folder_path = os.path.dirname(filepath)
+        os.makedirs(wiki_folder_path, exist_ok=True)
+
+        with self.profiler.phase("write"):
+            if 'part_path' in page:
+                # Written by a PageProcessor worker
+                self.manifest.commit_file(filepath, page['part_path'], page['sha256'], page['size'])
+            else:
+                self.manifest.write_file(filepath, page['content'], page['sha256'])
+
+        # Attachments that are already on disk are not downloaded again
+        pending_attachments = []
+        for attachment in page['attachments']:
+            att_filepath = os.path.join(wiki_folder_path, attachment['filename'])
+
+            if (self.journal.is_done("attachment", identifier, title, attachment['id'])
+                    and os.path.exists(att_filepath)):
+                continue
+
+            if self.manifest.is_unchanged_attachment(att_filepath, attachment):
+                self.journal.record("attachment", identifier, title, attachment['id'])
+                continue
+
+            pending_attachments.append((attachment, att_filepath))
+
+        self.progress.plan_attachments(sum(attachment['filesize'] for attachment, _ in pending_attachments))
+        return pending_attachments
+
+    def attachment_item(self, identifier: str, title: str, attachment: Dict, save_path: str) -> Dict:
+        """Retry queue entry of an attachment"""
+        return {
+            'type': "attachment",
+            'project': identifier,
+            'page': title,
+            'attachment': attachment['id'],
+            'filename': attachment['filename'],
+            'filesize': attachment['filesize'],
+            'digest': attachment['digest'],
+            'content_url': attachment['content_url'],
+            'save_path': save_path
+        }
+
+    def page_failed(self, identifier: str, title: str, save_dir: str, error: Exception):
+        self.add_log(self.redact(f"Failed to download wiki page '{title}': {error}"))
+        self.journal.record("page", identifier, title, status="failed")
+        self.record_failure({'type': "page", 'project': identifier, 'page': title, 'save_dir': save_dir}, error)
 
     def download_wiki_page_threaded(self, identifier: str, title: str, save_dir: str) -> bool:
-        """Individual wiki page download executed in thread"""
+        """Individual wiki page download executed in thread, raises DownloadCancelled if cancelled"""
         try:
-            params, auth = self.get_auth_params()
-            encoded_title = quote(title, safe='')
-            url = f"{self.redmine_url.get()}/projects/{identifier}/wiki/{encoded_title}.xml"
-
-            response = requests.get(url, params=params, auth=auth)
+            url, params, auth = self.page_request(identifier, title)
+            response = self.http_get(url, params=params, auth=auth)
             response.raise_for_status()
 
-            root = ET.fromstring(response.content)
-            page_title = root.find('title').text
-            page_text = root.find('text').text or ""
-
-            # Fetch attachments for this wiki page
-            attachments = self.fetch_attachments(identifier, title)
-
-            # Determine save location based on attachments
-            if attachments:
-                # Create folder with wiki page name
-                wiki_folder_name = self.sanitize_filename(page_title)
-                wiki_folder_path = os.path.join(save_dir, wiki_folder_name)
-                os.makedirs(wiki_folder_path, exist_ok=True)
-
-                # Convert image links to local paths
-                page_text = self.convert_image_links(page_text, attachments)
-
-                # Save markdown file in the folder
-                filename = f"{wiki_folder_name}.md"
-                filepath = os.path.join(wiki_folder_path, filename)
-
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(f"# {page_title}\n\n")
-                    f.write(page_text)
-
-                # Download attachments to the same folder
-                for attachment in attachments:
-                    att_filename = attachment['filename']
-                    att_filepath = os.path.join(wiki_folder_path, att_filename)
-                    self.add_log(f"  Downloading attachment: {att_filename}")
-                    self.download_attachment(attachment['content_url'], att_filepath)
-            else:
-                # No attachments - save markdown file directly
-                filename = f"{self.sanitize_filename(page_title)}.md"
-                filepath = os.path.join(save_dir, filename)
+            self.progress.add_page_bytes(len(response.content))
 
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(f"# {page_title}\n\n")
-                    f.write(page_text)
+            page = self.process_page_payload(response.content, save_dir)
+            pending_attachments = self.store_page(identifier, title, save_dir, page)
+
+            # Download attachments to the same folder
+            all_attachments_saved = True
+            for attachment, att_filepath in pending_attachments:
+                self.cancel_token.raise_if_cancelled()
+                self.add_log(f"  Downloading attachment: {attachment['filename']}")
+                item = self.attachment_item(identifier, title, attachment, att_filepath)
+                if self.download_attachment(attachment['content_url'], att_filepath, item):
+                    self.journal.record("attachment", identifier, title, attachment['id'])
+                else:
+                    all_attachments_saved = False
+
+            # The page stays pending in the journal until its attachments are saved
+            if all_attachments_saved:
+                self.journal.record("page", identifier, title)
 
             return True
 
+        except DownloadCancelled:
+            raise  # Not a failure, the page stays pending in the journal
         except Exception as e:
-            print(f"Failed to download wiki page '{title}': {e}")
+            self.page_failed(identifier, title, save_dir, e)
             return False
 
     def download_project_wiki(self, project: Dict):
@@ -721,13 +2768,13 @@ class RedmineWikiDownloader:
             params["limit"] = limit
             params["offset"] = offset
 
-            response = requests.get(url, params=params, auth=auth)
+            response = self.http_get(url, params=params, auth=auth)
             if response.status_code == 404:
                 return []  # Project without wiki
 
             response.raise_for_status()
 
-            root = ET.fromstring(response.content)
+            root = self.parse_xml(response.content)
 
             # Get pagination info
             total_count = int(root.get('total_count', 0))
@@ -755,10 +2802,10 @@ class RedmineWikiDownloader:
         encoded_title = quote(title, safe='')
         url = f"{self.redmine_url.get()}/projects/{identifier}/wiki/{encoded_title}.xml?key={self.api_key.get()}"
 
-        response = requests.get(url)
+        response = self.http_get(url)
         response.raise_for_status()
 
-        root = ET.fromstring(response.content)
+        root = self.parse_xml(response.content)
         page_title = root.find('title').text
         page_text = root.find('text').text or ""
 
@@ -772,7 +2819,7 @@ class RedmineWikiDownloader:
 
     def sanitize_filename(self, filename: str) -> str:
         """Remove special characters from filename"""
-        return re.sub(r'[<>:"/\\|?*]', '_', filename)
+        return sanitize_filename(filename)
 
     def truncate_text(self, text: str, max_length: int = 50) -> str:
         """Truncate text if too long"""
@@ -780,20 +2827,26 @@ class RedmineWikiDownloader:
             return text
         return text[:max_length-3] + "..."
 
+    def refresh_ui(self):
+        """Let pending UI updates through while downloading"""
+        self.root.update_idletasks()
+
     def add_log(self, message: str):
         """Add message to log text area"""
         if hasattr(self, 'log_text'):
-            # Temporarily set text widget to editable
-            self.log_text.config(state=tk.NORMAL)
-            # Add message (with timestamp)
-            timestamp = time.strftime("%H:%M:%S")
-            self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-            # Auto scroll (to bottom)
-            self.log_text.see(tk.END)
-            # Set back to read-only
-            self.log_text.config(state=tk.DISABLED)
-            # Update UI
-            self.root.update_idletasks()
+            # Download workers log concurrently
+            with self.log_lock:
+                # Temporarily set text widget to editable
+                self.log_text.config(state=tk.NORMAL)
+                # Add message (with timestamp)
+                timestamp = time.strftime("%H:%M:%S")
+                self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
+                # Auto scroll (to bottom)
+                self.log_text.see(tk.END)
+                # Set back to read-only
+                self.log_text.config(state=tk.DISABLED)
+                # Update UI
+                self.root.update_idletasks()
 
     def show_completion_screen(self):
         """Show completion screen"""
@@ -830,6 +2883,9 @@ class RedmineWikiDownloader:
 
     def open_save_directory(self):
         """Open save directory"""
+        import platform
+        import subprocess
+
         path = self.save_path.get()
         try:
             if platform.system() == "Windows":
@@ -846,6 +2902,316 @@ class RedmineWikiDownloader:
         self.root.mainloop()
 
 
+class SimpleVar:
+    """Stand-in for tkinter variables when running without a window"""
+
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class HeadlessDownloader(RedmineWikiDownloader):
+    """Command line runner that reuses the download engine without tkinter windows"""
+
+    WATCH_CURSOR_FILENAME = ".watch_cursor.json"
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+
+        # Variables
+        self.redmine_url = SimpleVar(args.url or "")
+        self.api_key = SimpleVar(args.api_key or os.environ.get("REDMINE_API_KEY", ""))
+        self.username = SimpleVar(args.username or "")
+        self.password = SimpleVar(args.password or os.environ.get("REDMINE_PASSWORD", ""))
+        self.auth_mode = SimpleVar("api_key" if self.api_key.get() else "id_pw")
+        self.save_path = SimpleVar(args.save_path)
+        self.resume_run = SimpleVar(args.resume)
+        self.error_message = SimpleVar()
+
+        # State
+        self.projects_data = []
+        self.init_download_state()
+        self.retry_workers = args.retry_workers
+        self.feed_key = args.feed_key
+        self.feed_limit = args.feed_limit
+        self.max_workers = args.workers
+        self.select_engine(args.engine)
+        self.process_workers = args.process_workers
+        self.process_batch = args.process_batch
+        self.shard = args.shard
+        if args.profile:
+            self.enable_profiling(args.profile)
+        self.rate_limiter = RateLimiter(args.max_requests_per_sec, args.max_bytes_per_sec, args.rate_window)
+
+        # Progress tracking
+        self.current_status = SimpleVar("")
+        self.progress_var = SimpleVar(0)
+        self.current_url = SimpleVar("")
+
+    def refresh_ui(self):
+        pass
+
+    def add_log(self, message: str):
+        timestamp = time.strftime("%H:%M:%S")
+        # Download workers log concurrently
+        with self.log_lock:
+            print(f"[{timestamp}] {message}", flush=True)
+
+    def run(self) -> int:
+        """Run download without GUI, returns process exit code"""
+        if self.args.retry_failed and not self.redmine_url.get():
+            # Failed items file remembers which instance it came from
+            with open(self.args.retry_failed, 'r', encoding='utf-8') as f:
+                self.redmine_url.set(json.load(f).get('redmine_url', ""))
+
+        if not self.validate_inputs():
+            print(f"Error: {self.error_message.get()} (--url and --api-key or --username/--password)")
+            return 2
+        if self.args.watch and not self.feed_key:
+            # Without the Atom key Redmine serves the anonymous feed, missing edits to private projects
+            print("Error: --watch needs --feed-key (My account -> Atom access key)")
+            return 2
+
+        self.is_downloading = True
+        if self.args.progress_interval > 0:
+            threading.Thread(target=self.report_progress, daemon=True).start()
+
+        try:
+            if self.args.retry_failed:
+                self.run_failed_items(self.args.retry_failed)
+            elif self.args.watch:
+                self.watch()
+            else:
+                self.projects_data = self.fetch_projects()
+                self.run_download(self.selected_projects())
+        except KeyboardInterrupt:
+            self.cancel_token.cancel()
+            self.add_log("Download cancelled by user.")
+            return 130
+        finally:
+            self.is_downloading = False
+            self.write_profile_report()
+
+        self.print_summary()
+        return 1 if self.failed_items else 0
+
+    def is_selected(self, identifier: str) -> bool:
+        """Check a project against --project and --shard"""
+        if self.args.project and identifier not in self.args.project:
+            return False
+        return in_shard(identifier, self.shard)
+
+    def selected_projects(self) -> List[Dict]:
+        projects = [p for p in self.projects_data if self.is_selected(p['identifier'])]
+        if self.shard:
+            self.add_log(f"Shard {self.shard['index']}/{self.shard['count']}: "
+                         f"{len(projects)} of {len(self.projects_data)} projects")
+        return projects
+
+    def report_progress(self):
+        """Log progress and throughput periodically while downloading"""
+        while True:
+            time.sleep(self.args.progress_interval)
+            if not self.is_downloading:
+                return
+            if not self.run_active:
+                continue  # Watch mode waiting for the next poll, the last run is already summarized
+            stats = self.progress.snapshot()
+            if stats['pages_planned']:
+                self.add_log(f"Progress {stats['fraction'] * 100:.1f}% "
+                             f"({stats['pages_done']}/{stats['pages_planned']} pages) - {format_throughput(stats)}")
+
+    def print_summary(self):
+        """Print totals and average throughput of the finished run"""
+        stats = self.progress.snapshot()
+        self.add_log(f"Summary: {stats['pages_done']} pages, {stats['bytes_received'] / 1024 ** 2:.2f} MB "
+                     f"in {format_duration(stats['elapsed_seconds'])} - "
+                     f"{stats['average_pages_per_sec']:.1f} pages/s, "
+                     f"{stats['average_bytes_per_sec'] / 1024 ** 2:.2f} MB/s, "
+                     f"{len(self.failed_items)} failed items")
+
+    def watch(self):
+        """Poll the activity feed and download only the wiki pages that changed"""
+        cursor_file = os.path.join(self.save_path.get(), self.WATCH_CURSOR_FILENAME)
+        cursor = None
+        if os.path.exists(cursor_file):
+            with open(cursor_file, 'r', encoding='utf-8') as f:
+                cursor = json.load(f)
+
+        self.add_log(f"Watching wiki edits every {self.args.watch_interval} seconds (Ctrl+C to stop)")
+
+        # A poll costs as much as its changes: journal and manifest are loaded once, not per poll
+        self.keep_run_state = True
+        try:
+            while True:
+                try:
+                    cursor = self.poll_changes(cursor, cursor_file)
+                except Exception as e:
+                    # Keep the old cursor so the edits are picked up by the next poll
+                    self.add_log(self.redact(f"Watch poll failed: {e}"))
+
+                time.sleep(self.args.watch_interval)
+        finally:
+            self.keep_run_state = False
+            if self.journal is not None:
+                self.journal.close()
+
+    def poll_changes(self, cursor: Optional[Dict], cursor_file: str) -> Optional[Dict]:
+        """Download the edits since cursor, returns the cursor to use for the next poll
+
+        Pages that failed to download are kept in the cursor's 'pending' list
+        and retried with the next poll's changes, as failed_items is reset on
+        every run.
+        """
+        if not self.projects_data:
+            self.projects_data = self.fetch_projects()
+
+        changes, new_cursor, complete = self.fetch_wiki_activity(cursor)
+        changes = [c for c in changes if self.is_selected(c[0])]
+        for change in (cursor or {}).get('pending', []):
+            if tuple(change) not in changes:
+                changes.append(tuple(change))
+
+        if cursor is None or not complete:
+            # No cursor yet, or more edits than the feed holds: fall back to a full sync
+            if cursor is None:
+                self.add_log("No watch cursor yet - running full sync")
+            else:
+                self.add_log("Activity feed does not reach the last cursor - running full sync")
+            completed = self.run_download(self.selected_projects())
+        elif changes:
+            if any(c[0] not in {p['identifier'] for p in self.projects_data} for c in changes):
+                self.projects_data = self.fetch_projects()
+            completed = self.download_changed_pages(changes)
+        else:
+            return cursor
+
+        # Only advance the cursor once the changes are on disk
+        if not completed:
+            return cursor
+        new_cursor['pending'] = []
+        for item in self.failed_items:
+            if [item['project'], item['page']] not in new_cursor['pending']:
+                new_cursor['pending'].append([item['project'], item['page']])
+        self.write_cursor(cursor_file, new_cursor)
+        # The cursor now records this progress, so the journal does not grow with every poll
+        self.journal.truncate()
+        return new_cursor
+
+    def write_cursor(self, cursor_file: str, cursor: Dict):
+        """Replace the cursor file atomically"""
+        os.makedirs(os.path.dirname(cursor_file), exist_ok=True)
+        temp_file = cursor_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(cursor, f)
+        os.replace(temp_file, cursor_file)
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte size such as 512K or 2M"""
+    units = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?)B?\s*', text.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size: '{text}'")
+    return int(float(match.group(1)) * units[match.group(2)])
+
+
+def parse_rate_window(text: str) -> Dict:
+    """Parse a time-of-day limit window such as 08:00-19:00,2,512K"""
+    match = re.fullmatch(r'(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2}),([\d.]+),(.+)', text.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid rate window: '{text}' (expected HH:MM-HH:MM,REQUESTS,BYTES)")
+
+    start_hour, start_minute, end_hour, end_minute = (int(g) for g in match.group(1, 2, 3, 4))
+    # 24:00 is allowed as the end of a window that runs until midnight
+    if (start_hour > 23 or start_minute > 59 or end_minute > 59
+            or end_hour > 24 or (end_hour == 24 and end_minute != 0)):
+        raise argparse.ArgumentTypeError(f"invalid rate window: '{text}' (hours 00-23, minutes 00-59, end may be 24:00)")
+    return {
+        'start': start_hour * 60 + start_minute,
+        'end': end_hour * 60 + end_minute,
+        'requests_per_sec': float(match.group(5)),
+        'bytes_per_sec': parse_size(match.group(6))
+    }
+
+
+def parse_shard(text: str) -> Dict:
+    """Parse a shard selection such as 0/4"""
+    match = re.fullmatch(r'(\d+)/(\d+)', text.strip())
+    if not match or int(match.group(1)) >= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"invalid shard: '{text}' (expected INDEX/COUNT, e.g. 0/4)")
+    return {'index': int(match.group(1)), 'count': int(match.group(2))}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command line options for headless runs"""
+    parser = argparse.ArgumentParser(description="Redmine Wiki Downloader")
+    parser.add_argument("--headless", action="store_true", help="run without GUI")
+    parser.add_argument("--url", help="Redmine URL")
+    parser.add_argument("--api-key", help="API key (or REDMINE_API_KEY environment variable)")
+    parser.add_argument("--username", help="username for ID/PW authentication")
+    parser.add_argument("--password", help="password (or REDMINE_PASSWORD environment variable)")
+    parser.add_argument("--save-path", default="./wiki", help="directory to save wiki pages")
+    parser.add_argument("--project", action="append",
+                        help="project identifier to download (repeatable, default: all projects)")
+    parser.add_argument("--resume", action="store_true", help="resume previous run from the journal")
+    parser.add_argument("--retry-failed", metavar="FILE",
+                        help=f"re-fetch only the items listed in a {RedmineWikiDownloader.FAILED_ITEMS_FILENAME} file")
+    parser.add_argument("--retry-workers", type=int, default=4,
+                        help="concurrent workers for the retry queue (default: 4)")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and download wiki pages changed in the activity feed")
+    parser.add_argument("--watch-interval", type=int, default=300,
+                        help="seconds between activity feed polls (default: 300)")
+    parser.add_argument("--feed-key", help="Atom access key for the activity feed (required with --watch)")
+    parser.add_argument("--feed-limit", type=int, default=15,
+                        help="feed content limit configured in Redmine (default: 15)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="concurrent page downloads per project (default: 4)")
+    parser.add_argument("--engine", choices=["threads", "asyncio"], default="threads",
+                        help="download engine: a thread per concurrent page, or one asyncio event loop "
+                             "for many concurrent pages (default: threads)")
+    # Experimental and undocumented until a multi-core `benchmark.py convert` run shows a speedup
+    parser.add_argument("--process-workers", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--process-batch", type=int, default=8, help=argparse.SUPPRESS)
+    parser.add_argument("--max-requests-per-sec", type=float, default=0,
+                        help="request rate limit shared by all workers (default: 0 = unlimited)")
+    parser.add_argument("--max-bytes-per-sec", type=parse_size, default=0,
+                        help="bandwidth limit shared by all workers, e.g. 512K or 2M (default: 0 = unlimited)")
+    parser.add_argument("--rate-window", type=parse_rate_window, action="append", default=[],
+                        help="limits for a time-of-day window as HH:MM-HH:MM,REQUESTS,BYTES, "
+                             "e.g. 08:00-19:00,2,512K (repeatable, 0 = unlimited)")
+    parser.add_argument("--shard", type=parse_shard,
+                        help="download only shard INDEX/COUNT of the projects, e.g. 0/4 (use a separate save path per shard)")
+    parser.add_argument("--merge-shards", nargs="+", metavar="DIR",
+                        help="merge manifests and metrics of shard save paths into --save-path")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="write cProfile and tracemalloc results per download phase to DIR (runs a single worker)")
+    parser.add_argument("--progress-interval", type=int, default=30,
+                        help="seconds between progress lines, 0 to disable (default: 30)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    app = RedmineWikiDownloader()
-    app.run()
\ No newline at end of file
+    if getattr(sys, 'frozen', False):
+        # Let --process-workers start worker processes from a PyInstaller build
+        import multiprocessing
+        multiprocessing.freeze_support()
+
+    args = parse_args()
+    if not args.merge_shards and find_spec("requests") is None:
+        print("The requests library is required: pip install -r requirements.txt")
+        sys.exit(1)
+
+    if args.merge_shards:
+        sys.exit(merge_shards(args.merge_shards, args.save_path))
+    elif args.headless or args.retry_failed or args.watch or args.shard:
+        sys.exit(HeadlessDownloader(args).run())
+    else:
+        app = RedmineWikiDownloader()
+        app.run()
\ No newline at end of file
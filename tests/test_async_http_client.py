@@ -0,0 +1,193 @@
+"""AsyncHttpClient response parsing and TLS setup, against scripted raw HTTP servers
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+async def read_request(reader) -> bool:
+    """Read one request head, returns False if the client closed the connection"""
+    while True:
+        line = await reader.readline()
+        if not line:
+            return False
+        if line in (b"\r\n", b"\n"):
+            return True
+
+
+class ScriptedServer:
+    """Answers each request with the next scripted response, None closes the connection without answering
+
+    A response followed by close=True closes the connection after sending it.
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.connections = 0
+        self.server = None
+
+    async def __aenter__(self) -> "ScriptedServer":
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while await read_request(reader):
+                response, close = self.responses.pop(0)
+                if response is None:
+                    break
+                writer.write(response)
+                await writer.drain()
+                if close:
+                    break
+        finally:
+            writer.close()
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 10))
+
+
+def chunked(body: bytes) -> bytes:
+    return b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n" + body
+
+
+class ContentLengthTest(unittest.TestCase):
+
+    def test_complete_body_keeps_connection(self):
+        async def scenario():
+            async with ScriptedServer([(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello", False)]) as server:
+                client = main.AsyncHttpClient()
+                response = await client.get(server.url + "/page")
+                self.assertEqual((response.status_code, response.content), (200, b"hello"))
+                self.assertEqual(sum(len(idle) for idle in client.idle.values()), 1)
+                client.close()
+
+        run(scenario())
+
+    def test_truncated_body_raises(self):
+        async def scenario():
+            async with ScriptedServer([(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nhello", True)]) as server:
+                client = main.AsyncHttpClient()
+                with self.assertRaises(ConnectionError):
+                    await client.get(server.url + "/page")
+                self.assertFalse(any(client.idle.values()))
+
+        run(scenario())
+
+
+class ChunkedTest(unittest.TestCase):
+
+    def get(self, body: bytes, close: bool = True):
+        async def scenario():
+            async with ScriptedServer([(chunked(body), close)]) as server:
+                client = main.AsyncHttpClient()
+                try:
+                    response = await client.get(server.url + "/page")
+                    return response.content, sum(len(idle) for idle in client.idle.values())
+                finally:
+                    client.close()
+
+        return run(scenario())
+
+    def test_chunks_with_extensions_and_trailers(self):
+        content, pooled = self.get(b"5;name=value\r\nhello\r\n6\r\n world\r\n0\r\nX-Checksum: 1\r\n\r\n", close=False)
+        self.assertEqual(content, b"hello world")
+        self.assertEqual(pooled, 1)
+
+    def test_truncated_between_chunks_raises(self):
+        with self.assertRaises(ConnectionError):
+            self.get(b"5\r\nhello\r\n")
+
+    def test_truncated_inside_chunk_raises(self):
+        with self.assertRaises(ConnectionError):
+            self.get(b"a\r\nhello")
+
+    def test_truncated_in_trailers_raises(self):
+        with self.assertRaises(ConnectionError):
+            self.get(b"5\r\nhello\r\n0\r\n")
+
+    def test_invalid_chunk_size_raises(self):
+        with self.assertRaises(ConnectionError):
+            self.get(b"zz\r\nhello\r\n0\r\n\r\n")
+
+    def test_missing_crlf_after_chunk_raises(self):
+        with self.assertRaises(ConnectionError):
+            self.get(b"5\r\nhelloXX0\r\n\r\n")
+
+
+class KeepAliveTest(unittest.TestCase):
+
+    def test_stale_reused_connection_is_retried_once(self):
+        async def scenario():
+            responses = [
+                (b"HTTP/1.1 200 OK\r\nContent-Length: 3\r\n\r\none", False),
+                (None, True),  # Server drops the idle connection when it is reused
+                (b"HTTP/1.1 200 OK\r\nContent-Length: 3\r\n\r\ntwo", False),
+            ]
+            async with ScriptedServer(responses) as server:
+                client = main.AsyncHttpClient()
+                first = await client.get(server.url + "/one")
+                second = await client.get(server.url + "/two")
+                client.close()
+                self.assertEqual((first.content, second.content), (b"one", b"two"))
+                self.assertEqual(server.connections, 2)
+
+        run(scenario())
+
+    def test_new_connection_closed_without_response_raises(self):
+        async def scenario():
+            async with ScriptedServer([(None, True)]) as server:
+                client = main.AsyncHttpClient()
+                with self.assertRaises(ConnectionError):
+                    await client.get(server.url + "/page")
+                self.assertEqual(server.connections, 1)
+
+        run(scenario())
+
+
+class SslContextTest(unittest.TestCase):
+    """The asyncio engine verifies against the same CA bundle as the threads engine"""
+
+    def context_arguments(self, environment):
+        keys = ("REQUESTS_CA_BUNDLE", "CURL_CA_BUNDLE", "SSL_CERT_FILE")
+        clean = {key: value for key, value in os.environ.items() if key not in keys}
+        with mock.patch.dict(os.environ, dict(clean, **environment), clear=True), \
+                mock.patch("ssl.create_default_context") as create:
+            main.requests_ssl_context()
+        return create.call_args.kwargs
+
+    def test_requests_ca_bundle_wins(self):
+        arguments = self.context_arguments({"REQUESTS_CA_BUNDLE": "/corp/ca.pem", "CURL_CA_BUNDLE": "/other.pem"})
+        self.assertEqual(arguments, {"cafile": "/corp/ca.pem"})
+
+    def test_curl_and_ssl_cert_file(self):
+        self.assertEqual(self.context_arguments({"CURL_CA_BUNDLE": "/curl.pem"}), {"cafile": "/curl.pem"})
+        self.assertEqual(self.context_arguments({"SSL_CERT_FILE": "/ssl.pem"}), {"cafile": "/ssl.pem"})
+
+    def test_bundle_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(self.context_arguments({"REQUESTS_CA_BUNDLE": directory}), {"capath": directory})
+
+
+if __name__ == "__main__":
+    unittest.main()